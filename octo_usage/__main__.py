@@ -7,16 +7,40 @@ Execute with:
 """
 
 import os
+import queue
+import threading
 from datetime import UTC, datetime
 
 import click
 
 from octo_usage.logging_config import get_logger, setup_logging
 from octo_usage.octopus import Octopus
-from octo_usage.postgres import PostgresDB
+from octo_usage.postgres import BufferedInserter, PostgresDB
 
 logger = get_logger(__name__)
 
+API_TS_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class _FetchStopped(Exception):
+    """Raised from the page callback to end a fetch whose pages are no longer consumed."""
+
+
+def _to_api_ts(dt):
+    """Format a datetime as an Octopus API UTC timestamp (e.g. 2026-02-12T01:00:00Z).
+
+    Args:
+        dt: Datetime to format. Aware values are converted to UTC, naive values are taken as UTC.
+
+    Returns:
+        Timestamp string, or None if dt is None
+    """
+    if dt is None:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(UTC)
+    return dt.strftime(API_TS_FORMAT)
+
 
 @click.command()
 @click.option(
@@ -47,16 +71,25 @@ logger = get_logger(__name__)
     default=None,
     help="Limit number of records to display in dry-run mode (default: show all)",
 )
-def main(period_start, period_end, infer, dry_run, limit):  # noqa: C901
+@click.option(
+    "--db-batch-size",
+    type=click.IntRange(min=1),
+    default=10_000,
+    help="Number of records to buffer before each database write (default: 10000)",
+)
+def main(period_start, period_end, infer, dry_run, limit, db_batch_size):  # noqa: C901
     """Fetch electricity consumption data from Octopus Energy API and store in PostgreSQL."""
     # Initialize logging
     setup_logging()
 
+    db = None
+
     # Handle --infer flag to automatically determine period_start
     if infer and not period_start:
         logger.info("Inferring period_start from latest stored data...")
         try:
             db = PostgresDB()
+            click.get_current_context().call_on_close(db.close)
             mpan = os.getenv("OCTOPUS_ELECTRICITY_MPAN")
 
             try:
@@ -68,7 +101,7 @@ def main(period_start, period_end, infer, dry_run, limit):  # noqa: C901
                         f"Found latest consumption data at {latest_timestamp}, fetching from that point onwards"
                     )
                     # Parse the ISO timestamp string (format: 2026-02-12T01:00:00Z)
-                    period_start = datetime.fromisoformat(latest_timestamp.replace("Z", "+00:00"))
+                    period_start = datetime.fromisoformat(latest_timestamp)
                 else:
                     logger.info("No consumption data found in database, fetching from 1970-01-01")
                     period_start = None  # This will default to 1970-01-01 in Octopus class
@@ -85,27 +118,8 @@ def main(period_start, period_end, infer, dry_run, limit):  # noqa: C901
             raise
 
     # Format datetimes for API (timezone-aware → UTC, naive → UTC as-is with Z)
-    if period_start:
-        if period_start.tzinfo is not None:
-            # Timezone-aware: convert to UTC
-            period_start_utc = period_start.astimezone(UTC)
-            period_start_str = period_start_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            # Naive: assume UTC and add Z suffix
-            period_start_str = period_start.isoformat() + "Z"
-    else:
-        period_start_str = None
-
-    if period_end:
-        if period_end.tzinfo is not None:
-            # Timezone-aware: convert to UTC
-            period_end_utc = period_end.astimezone(UTC)
-            period_end_str = period_end_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            # Naive: assume UTC and add Z suffix
-            period_end_str = period_end.isoformat() + "Z"
-    else:
-        period_end_str = None
+    period_start_str = _to_api_ts(period_start)
+    period_end_str = _to_api_ts(period_end)
 
     logger.debug(f"Fetching consumption from {period_start_str or 'start'} to {period_end_str or 'now'}")
 
@@ -135,20 +149,10 @@ def main(period_start, period_end, infer, dry_run, limit):  # noqa: C901
         records_to_show = consumptions[:limit] if limit else consumptions
 
         for i, cons in enumerate(records_to_show, 1):
-            # Handle both datetime objects and string timestamps
-            start_str = (
-                cons.interval_start.isoformat()
-                if hasattr(cons.interval_start, "isoformat")
-                else str(cons.interval_start)
-            )
-            end_str = (
-                cons.interval_end.isoformat() if hasattr(cons.interval_end, "isoformat") else str(cons.interval_end)
-            )
-
             logger.info(
                 f"[{i:4d}] MPAN: {cons.mpan} | Meter: {cons.meter_sn} | "
                 f"Consumption: {cons.consumption:>6.3f} {cons.unit} | "
-                f"Interval: {start_str} → {end_str}"
+                f"Interval: {cons.interval_start.isoformat()} → {cons.interval_end.isoformat()}"
             )
 
         logger.info("=" * 80)
@@ -158,32 +162,74 @@ def main(period_start, period_end, infer, dry_run, limit):  # noqa: C901
             logger.info(f"Total records displayed: {len(records_to_show)}")
     else:
         # Non-dry-run: stream pages to database as they arrive
-        logger.info("Connecting to PostgreSQL database...")
-        db = PostgresDB()
+        if db is None:
+            logger.info("Connecting to PostgreSQL database...")
+            db = PostgresDB()
+            click.get_current_context().call_on_close(db.close)
         db.create_tables()
 
-        total_records = 0
-
-        # Define per-page callback to insert each page as it arrives
-        def insert_page(page_consumptions):
-            nonlocal total_records
-            total_records += len(page_consumptions)
-            logger.info(
-                f"Inserting {len(page_consumptions)} consumption records "
-                f"from this page (total so far: {total_records})..."
-            )
-            db.insert_consumptions_batch(page_consumptions)
+        # Fetch in a background thread, handing pages over a bounded queue so HTTP and DB I/O overlap
+        pages = queue.Queue(maxsize=4)
+        fetch_errors = []
+        stop = threading.Event()
+
+        def hand_over(item):
+            """Put item on the queue, giving up (returning False) once the consumer has stopped reading."""
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def on_page(page):
+            if not hand_over(page):
+                raise _FetchStopped
+
+        def fetch():
+            try:
+                octopus.consumption(
+                    period_from=period_start_str, period_to=period_end_str, on_page=on_page, as_tuples=True
+                )
+            except _FetchStopped:
+                pass
+            except Exception as e:
+                fetch_errors.append(e)
+            finally:
+                # Sentinel: no more pages
+                hand_over(None)
 
-        # Fetch with per-page callback
         logger.info("Fetching and storing consumption records...")
-        consumptions = octopus.consumption(period_from=period_start_str, period_to=period_end_str, on_page=insert_page)
+        fetcher = threading.Thread(target=fetch, name="octopus-fetch", daemon=True)
+        fetcher.start()
 
-        if not consumptions:
+        # Buffer pages so each database write covers several of them. Pages arrive in order, so
+        # whatever was received before a fetch failure is safe to store, and is flushed on exit.
+        try:
+            with BufferedInserter(db, chunk_size=db_batch_size) as inserter:
+                while (page := pages.get()) is not None:
+                    inserter.add_rows(page)
+        except BaseException:
+            # A database write failed: stop the fetcher, which may be blocked on the full queue, and wait for it
+            stop.set()
+            fetcher.join()
+            for e in fetch_errors:
+                logger.error(f"Fetching consumption also failed: {e}")
+            raise
+        fetcher.join()
+
+        total_records = inserter.total
+
+        if fetch_errors:
+            raise fetch_errors[0]
+
+        if not total_records:
             logger.warning("No consumption data received from Octopus API")
             return
 
         logger.info(
-            f"Fetched {len(consumptions)} consumption records from "
+            f"Fetched {total_records} consumption records from "
             f"{period_start_str or 'start'} to {period_end_str or 'now'}"
         )
         logger.info("Successfully stored all consumption data in PostgreSQL")
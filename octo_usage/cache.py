@@ -0,0 +1,117 @@
+"""Optional Redis-backed cache for Octopus Energy API responses.
+
+Enabled by setting OCTOPUS_CACHE_URL (e.g. redis://localhost:6379/0).
+Requires the redis package: pip install "octo-usage[cache]".
+"""
+
+import hashlib
+import os
+from datetime import UTC, datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from .dataclasses import parse_timestamp
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResponseCache:
+    """Cache raw API response bodies in Redis, keyed by request URL and parameters.
+
+    Pages for periods ending more than RECENT_WINDOW ago never change, so they are kept
+    for HISTORICAL_TTL. Open-ended or recent periods may still gain readings and expire
+    after RECENT_TTL.
+    """
+
+    KEY_PREFIX = "octo-usage:"
+    RECENT_TTL = 60
+    HISTORICAL_TTL = 24 * 60 * 60
+    RECENT_WINDOW = timedelta(hours=48)
+
+    def __init__(self, client):
+        """Initialize the cache.
+
+        Args:
+            client: Redis client (anything implementing get and setex)
+        """
+        self.client = client
+
+    @classmethod
+    def from_env(cls) -> ResponseCache | None:
+        """Build a cache from OCTOPUS_CACHE_URL.
+
+        Returns:
+            ResponseCache instance, or None if caching is not configured or redis is not installed
+        """
+        url = os.getenv("OCTOPUS_CACHE_URL")
+        if not url:
+            return None
+
+        try:
+            import redis
+        except ImportError:
+            logger.warning("OCTOPUS_CACHE_URL is set but the redis package is not installed, caching disabled")
+            return None
+
+        logger.debug("Caching Octopus API responses in Redis")
+        return cls(redis.Redis.from_url(url))
+
+    def key(self, url: str, params: dict | None = None) -> str:
+        """Build the cache key for a request.
+
+        Args:
+            url: Full request URL
+            params: Query parameters sent alongside the URL
+
+        Returns:
+            Cache key string
+        """
+        raw = url + repr(sorted((params or {}).items()))
+        return self.KEY_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+    def ttl(self, url: str, params: dict | None = None) -> int:
+        """Pick the expiry for a response based on the requested period_to.
+
+        Args:
+            url: Full request URL (period_to may be part of a paginated URL's query)
+            params: Query parameters sent alongside the URL
+
+        Returns:
+            TTL in seconds
+        """
+        period_to = (params or {}).get("period_to") or parse_qs(urlsplit(url).query).get("period_to", [None])[0]
+        if period_to:
+            period_end = parse_timestamp(period_to)
+            if period_end.tzinfo is None:
+                period_end = period_end.replace(tzinfo=UTC)
+            if datetime.now(UTC) - period_end > self.RECENT_WINDOW:
+                return self.HISTORICAL_TTL
+        return self.RECENT_TTL
+
+    def get(self, key: str) -> bytes | None:
+        """Fetch a cached response body.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached body, or None on a miss or if Redis is unavailable
+        """
+        try:
+            return self.client.get(key)
+        except Exception as e:
+            logger.warning(f"Unable to read from response cache: {e}")
+            return None
+
+    def set(self, key: str, content: bytes, ttl: int) -> None:
+        """Store a response body.
+
+        Args:
+            key: Cache key
+            content: Raw response body
+            ttl: Expiry in seconds
+        """
+        try:
+            self.client.setex(key, ttl, content)
+        except Exception as e:
+            logger.warning(f"Unable to write to response cache: {e}")
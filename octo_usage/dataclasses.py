@@ -1,5 +1,20 @@
 from dataclasses import dataclass
 from datetime import datetime
+from operator import attrgetter
+
+
+def parse_timestamp(value: str | datetime) -> datetime:
+    """Parse an ISO 8601 timestamp from the API (e.g. 2023-01-15T23:30:00Z).
+
+    Args:
+        value: ISO 8601 string, or an already parsed datetime (returned unchanged)
+
+    Returns:
+        datetime instance (timezone-aware when the string carries an offset or Z suffix)
+    """
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
 
 
 @dataclass(slots=True)
@@ -19,6 +34,16 @@ class ElectricityConsumption:
     id: int | None = None
     created_at: datetime | None = None
 
+    # Column order of UPSERT_SQL and COPY_STAGING_SQL, as returned by to_insert_values and to_insert_rows
+    INSERT_COLUMNS = ("mpan", "meter_sn", "consumption", "interval_start", "interval_end", "unit")
+
+    # Table column order: the row layout unpacked by from_row and the key order of to_dict
+    _FIELDS = ("id", "mpan", "meter_sn", "consumption", "interval_start", "interval_end", "unit", "created_at")
+
+    # Read every field of a record in one C-level call (_getter for to_dict, _insert_getter for the insert tuples)
+    _getter = attrgetter(*_FIELDS)
+    _insert_getter = attrgetter(*INSERT_COLUMNS)
+
     # Table creation SQL
     CREATE_TABLE_SQL = """
         CREATE TABLE IF NOT EXISTS electricity_consumption (
@@ -36,13 +61,124 @@ class ElectricityConsumption:
         CREATE INDEX IF NOT EXISTS idx_mpan_interval
             ON electricity_consumption(mpan, interval_start DESC);
 
+        -- Serves MAX(interval_end) per MPAN (get_latest_consumption_timestamps) with one probe from the index end
+        CREATE INDEX IF NOT EXISTS idx_mpan_interval_end
+            ON electricity_consumption(mpan, interval_end DESC);
+
         CREATE INDEX IF NOT EXISTS idx_meter_interval
             ON electricity_consumption(meter_sn, interval_start DESC);
 
         CREATE INDEX IF NOT EXISTS idx_interval_start
             ON electricity_consumption(interval_start DESC);
+
+        -- Daily totals per (mpan, date, unit), kept up to date by every PostgresDB write method
+        CREATE TABLE IF NOT EXISTS electricity_daily (
+            mpan VARCHAR(13) NOT NULL,
+            date DATE NOT NULL,
+            unit VARCHAR(10),
+            total_consumption DECIMAL NOT NULL,
+            reading_count BIGINT NOT NULL,
+            first_reading TIMESTAMPTZ NOT NULL,
+            last_reading TIMESTAMPTZ NOT NULL
+        );
+
+        -- Conflict target of UPSERT_DAILY_SQL. COALESCE makes a NULL unit conflict with itself, which
+        -- NULLS NOT DISTINCT would do only on PostgreSQL 15+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_mpan_date
+            ON electricity_daily(mpan, date, COALESCE(unit, ''));
+
+        -- Single row holding the time zone electricity_daily buckets readings into days in, set once by
+        -- INIT_DAILY_TIMEZONE_SQL so every writer agrees on day boundaries whatever its session TimeZone
+        CREATE TABLE IF NOT EXISTS electricity_daily_timezone (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            timezone TEXT NOT NULL
+        );
+    """
+
+    # Relations created by CREATE_TABLE_SQL, checked before running the DDL
+    SCHEMA_RELATIONS = (
+        "electricity_consumption",
+        "idx_mpan_interval",
+        "idx_mpan_interval_end",
+        "idx_meter_interval",
+        "idx_interval_start",
+        "electricity_daily",
+        "idx_daily_mpan_date",
+        "electricity_daily_timezone",
+    )
+
+    # Fix the day-bucketing zone: the given one (DAILY_TIMEZONE) or else the creating session's TimeZone,
+    # which is the server's unless the connection overrides it. An existing row is kept.
+    INIT_DAILY_TIMEZONE_SQL = """
+        INSERT INTO electricity_daily_timezone (timezone)
+        VALUES (COALESCE(%s, current_setting('TimeZone')))
+        ON CONFLICT (id) DO NOTHING;
+    """
+
+    # Recompute all of electricity_daily (DELETE rather than TRUNCATE, so readers are not blocked).
+    # Every daily statement reads days in the electricity_daily_timezone zone, so writers with different
+    # TimeZone settings agree on which row a reading belongs to. The lock waits for open writes to electricity_daily and
+    # holds off new ones until commit, so none can add a day row between the DELETE and the INSERT.
+    REBUILD_DAILY_SQL = """
+        LOCK TABLE electricity_daily IN SHARE ROW EXCLUSIVE MODE;
+
+        DELETE FROM electricity_daily;
+
+        INSERT INTO electricity_daily
+        (mpan, date, unit, total_consumption, reading_count, first_reading, last_reading)
+        SELECT c.mpan, DATE(c.interval_start AT TIME ZONE tz.timezone), c.unit,
+            SUM(c.consumption), COUNT(*), MIN(c.interval_start), MAX(c.interval_end)
+        FROM electricity_consumption c, electricity_daily_timezone tz
+        GROUP BY c.mpan, DATE(c.interval_start AT TIME ZONE tz.timezone), c.unit;
+    """
+
+    # Incremental maintenance of electricity_daily: these statements take the written rows as parallel
+    # (mpan, interval_start) arrays and only touch their days. The DELETE drops groups that no longer
+    # have readings, then the upsert recomputes each day from its idx_mpan_interval range.
+    #
+    # Under READ COMMITTED a recompute cannot see another transaction's uncommitted readings for the same
+    # day, so two writers could each commit a partial total. LOCK_DAILY_SQL first takes a transaction-level
+    # advisory lock per (mpan, day): the second writer waits for the first to commit, and its recompute then
+    # sees both. Locks are taken in sorted order (volatile functions run after the ORDER BY) to avoid deadlocks.
+    LOCK_DAILY_SQL = """
+        SELECT pg_advisory_xact_lock(hashtext(mpan), date - DATE '1970-01-01')
+        FROM (
+            SELECT DISTINCT r.mpan, DATE(r.interval_start AT TIME ZONE tz.timezone) AS date
+            FROM unnest(%s::text[], %s::timestamptz[]) AS r(mpan, interval_start), electricity_daily_timezone tz
+        ) AS days
+        ORDER BY mpan, date;
+    """
+
+    DELETE_DAILY_SQL = """
+        DELETE FROM electricity_daily d
+        USING unnest(%s::text[], %s::timestamptz[]) AS r(mpan, interval_start), electricity_daily_timezone tz
+        WHERE d.mpan = r.mpan AND d.date = DATE(r.interval_start AT TIME ZONE tz.timezone);
+    """
+
+    UPSERT_DAILY_SQL = """
+        INSERT INTO electricity_daily
+        (mpan, date, unit, total_consumption, reading_count, first_reading, last_reading)
+        SELECT c.mpan, days.date, c.unit, SUM(c.consumption), COUNT(*), MIN(c.interval_start), MAX(c.interval_end)
+        FROM (
+            SELECT DISTINCT r.mpan, DATE(r.interval_start AT TIME ZONE tz.timezone) AS date, tz.timezone
+            FROM unnest(%s::text[], %s::timestamptz[]) AS r(mpan, interval_start), electricity_daily_timezone tz
+        ) AS days
+        JOIN electricity_consumption c
+            ON c.mpan = days.mpan
+            AND c.interval_start >= days.date::timestamp AT TIME ZONE days.timezone
+            AND c.interval_start < (days.date + 1)::timestamp AT TIME ZONE days.timezone
+        GROUP BY c.mpan, days.date, c.unit
+        ON CONFLICT (mpan, date, COALESCE(unit, ''))
+        DO UPDATE SET
+            total_consumption = EXCLUDED.total_consumption,
+            reading_count = EXCLUDED.reading_count,
+            first_reading = EXCLUDED.first_reading,
+            last_reading = EXCLUDED.last_reading;
     """
 
+    # Number of SCHEMA_RELATIONS that already exist, in a single catalog lookup
+    SCHEMA_EXISTS_SQL = "SELECT count(to_regclass(name)) FROM unnest(%s::text[]) AS name;"
+
     # Insert/upsert SQL
     UPSERT_SQL = """
         INSERT INTO electricity_consumption
@@ -56,6 +192,42 @@ class ElectricityConsumption:
         RETURNING id, created_at;
     """
 
+    # Bulk upsert SQL: COPY rows into a staging table, then merge them in a single statement.
+    # The staging table lives for the whole (pooled) session and is emptied on commit, so the
+    # merge keeps referring to the same relation and its prepared plan stays valid across batches.
+    # Temporary tables are never WAL-logged, so staged rows already cost no WAL (like UNLOGGED) while
+    # staying private to the session, which lets concurrent loaders stage without clobbering each other.
+    CREATE_STAGING_SQL = """
+        CREATE TEMP TABLE IF NOT EXISTS electricity_consumption_staging
+        ON COMMIT DELETE ROWS AS
+        SELECT mpan, meter_sn, consumption::float8 AS consumption, interval_start, interval_end, unit
+        FROM electricity_consumption
+        WITH NO DATA;
+    """
+
+    # Binary COPY skips text formatting/parsing of every value. consumption is staged as float8 so
+    # Python floats are sent as-is, and cast to DECIMAL(10, 3) by the merge.
+    COPY_STAGING_SQL = """
+        COPY electricity_consumption_staging
+        (mpan, meter_sn, consumption, interval_start, interval_end, unit)
+        FROM STDIN (FORMAT BINARY)
+    """
+
+    # Column types of the staging table, in COPY_STAGING_SQL order (required by binary COPY)
+    STAGING_TYPES = ("varchar", "varchar", "float8", "timestamptz", "timestamptz", "varchar")
+
+    MERGE_STAGING_SQL = """
+        INSERT INTO electricity_consumption
+        (mpan, meter_sn, consumption, interval_start, interval_end, unit)
+        SELECT mpan, meter_sn, consumption, interval_start, interval_end, unit
+        FROM electricity_consumption_staging
+        ON CONFLICT (mpan, meter_sn, interval_start)
+        DO UPDATE SET
+            consumption = EXCLUDED.consumption,
+            interval_end = EXCLUDED.interval_end,
+            unit = EXCLUDED.unit;
+    """
+
     SELECT_ALL_SQL = "SELECT * FROM electricity_consumption ORDER BY interval_start DESC;"
 
     SELECT_BY_MPAN_SQL = """
@@ -81,22 +253,17 @@ class ElectricityConsumption:
         Returns:
             ElectricityConsumption instance
         """
-        return cls(
-            id=row[0],
-            mpan=row[1],
-            meter_sn=row[2],
-            consumption=float(row[3]),
-            interval_start=row[4],
-            interval_end=row[5],
-            unit=row[6],
-            created_at=row[7],
-        )
+        # Positional in field order (mpan, meter_sn, consumption, interval_start, interval_end, unit, id, created_at),
+        # which skips keyword matching for every row read
+        row_id, mpan, meter_sn, consumption, interval_start, interval_end, unit, created_at = row
+        return cls(mpan, meter_sn, float(consumption), interval_start, interval_end, unit, row_id, created_at)
 
     @classmethod
     def from_dict(cls, data: dict) -> ElectricityConsumption:
         """Convert a dictionary to dataclass instance.
 
         Useful when converting from API responses or other dict sources.
+        ISO 8601 interval strings are parsed into datetime instances.
 
         Args:
             data: Dictionary with consumption data
@@ -108,8 +275,8 @@ class ElectricityConsumption:
             mpan=data.get("mpan"),
             meter_sn=data.get("meter_sn") or data.get("serial_number"),
             consumption=float(data["consumption"]),
-            interval_start=data["interval_start"],
-            interval_end=data["interval_end"],
+            interval_start=parse_timestamp(data["interval_start"]),
+            interval_end=parse_timestamp(data["interval_end"]),
             unit=data.get("unit", "kWh"),
             id=data.get("id"),
             created_at=data.get("created_at"),
@@ -121,16 +288,7 @@ class ElectricityConsumption:
         Returns:
             Dictionary representation of the dataclass
         """
-        return {
-            "id": self.id,
-            "mpan": self.mpan,
-            "meter_sn": self.meter_sn,
-            "consumption": self.consumption,
-            "interval_start": self.interval_start,
-            "interval_end": self.interval_end,
-            "unit": self.unit,
-            "created_at": self.created_at,
-        }
+        return dict(zip(self._FIELDS, self._getter(self), strict=False))
 
     def to_insert_values(self) -> tuple:
         """Convert to tuple of values for INSERT statement.
@@ -138,4 +296,18 @@ class ElectricityConsumption:
         Returns:
             Tuple of values in order: (mpan, meter_sn, consumption, interval_start, interval_end, unit)
         """
-        return (self.mpan, self.meter_sn, self.consumption, self.interval_start, self.interval_end, self.unit)
+        return self._insert_getter(self)
+
+    @classmethod
+    def to_insert_rows(cls, consumptions: list[ElectricityConsumption]) -> list[tuple]:
+        """Convert many instances to INSERT value tuples.
+
+        Equivalent to [c.to_insert_values() for c in consumptions], without a method call per record.
+
+        Args:
+            consumptions: ElectricityConsumption instances
+
+        Returns:
+            List of tuples in to_insert_values order
+        """
+        return list(map(cls._insert_getter, consumptions))
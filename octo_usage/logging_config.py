@@ -16,30 +16,35 @@ class LogfmtFormatter(logging.Formatter):
     Example: time=2026-02-11T20:00:00Z level=INFO logger=octopus.py msg="Starting sync"
     """
 
+    # Escapes quotes and newlines so each record stays on a single logfmt line
+    _ESC = str.maketrans({'"': '\\"', "\n": "\\n"})
+    _TEMPLATE = 'time=%s level=%s logger=%s msg="%s"'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Logger name -> module name, computed once per logger rather than per record
+        self._short_names = {}
+
     def format(self, record):
         """Format a log record as logfmt."""
         timestamp = self.formatTime(record, "%Y-%m-%dT%H:%M:%SZ")
-        level = record.levelname.lower()
-        logger_name = record.name.split(".")[-1]  # Use just the module name
-        msg = record.getMessage()
 
-        # Escape quotes in message
-        msg = msg.replace('"', '\\"')
+        logger_name = self._short_names.get(record.name)
+        if logger_name is None:
+            logger_name = self._short_names[record.name] = record.name.rpartition(".")[2]  # Use just the module name
 
-        # Base logfmt output
-        logfmt_parts = [
-            f"time={timestamp}",
-            f"level={level}",
-            f"logger={logger_name}",
-            f'msg="{msg}"',
-        ]
+        line = self._TEMPLATE % (
+            timestamp,
+            record.levelname.lower(),
+            logger_name,
+            record.getMessage().translate(self._ESC),
+        )
 
         # Add exception info if present
         if record.exc_info:
-            exc_text = self.formatException(record.exc_info).replace("\n", "\\n")
-            logfmt_parts.append(f'exc="{exc_text}"')
+            line += f' exc="{self.formatException(record.exc_info).translate(self._ESC)}"'
 
-        return " ".join(logfmt_parts)
+        return line
 
 
 def setup_logging(log_level=None, use_logfmt=None):
@@ -1,36 +1,67 @@
+import logging
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
 from http.client import responses
-from urllib.parse import urljoin
+from math import ceil
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
 
-import requests
-from requests import Session
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from requests.exceptions import HTTPError
 
-from octo_usage.dataclasses import ElectricityConsumption
+from octo_usage.dataclasses import ElectricityConsumption, parse_timestamp
 
+from .cache import ResponseCache
 from .logging_config import get_logger
 
+# Prefer orjson for decoding API pages when installed (pip install "octo-usage[orjson]")
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
 logger = get_logger(__name__)
 
 
 class Octopus(Session):
     """Octopus Energy API client inheriting from requests.Session.
 
-    Handles authentication, request logging, and pagination.
+    Handles authentication, request logging, and pagination. Once the first page reports
+    the total record count, the remaining pages are fetched concurrently.
     """
 
     BASE_URL = "https://api.octopus.energy/"
     API_ENDPOINT = "v1/"
     DEFAULT_PERIOD_FROM = "1970-01-01T00:00:00Z"
+    TIMEOUT = 30
+
+    def __init__(self, page_size=1000, max_workers=8):
+        # Remaining pages are fetched by a ThreadPoolExecutor, which needs at least one worker
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
 
-    def __init__(self, page_size=1000):
         super().__init__()
         self.api_key = os.getenv("OCTOPUS_API_KEY")
         self.electricity_mpan = os.getenv("OCTOPUS_ELECTRICITY_MPAN")
         self.electricity_sn = os.getenv("OCTOPUS_ELECTRICITY_SN")
         self.page_size = page_size
+        self.max_workers = max_workers
+
+        # Request URLs only vary by endpoint, so build the fixed parts once
+        self._base = self.BASE_URL + self.API_ENDPOINT
+        self._consumption_endpoint = (
+            f"electricity-meter-points/{self.electricity_mpan}/meters/{self.electricity_sn}/consumption"
+        )
+
+        # Optional Redis response cache (OCTOPUS_CACHE_URL), None when disabled
+        self.cache = ResponseCache.from_env()
+
+        # Size the connection pool to the concurrent page fetches so each worker reuses a keep-alive connection
+        self.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
 
         # Set up authentication
         self.auth = HTTPBasicAuth(self.api_key, "")
@@ -44,9 +75,7 @@ class Octopus(Session):
     def _request_timestamp(self, r, *args, **kwargs):
         """Hook to capture request timestamp from response headers."""
         try:
-            r.request_timestamp = datetime.strptime(r.headers.get("Date"), "%a, %d %b %Y %H:%M:%S %Z").replace(
-                tzinfo=UTC
-            )
+            r.request_timestamp = parsedate_to_datetime(r.headers.get("Date"))
         except ValueError, TypeError:
             r.request_timestamp = datetime.now(UTC)
         return r
@@ -66,52 +95,130 @@ class Octopus(Session):
             HTTPError: If the response status indicates an error
         """
         # Log the request parameters at debug level
-        logger.debug(f"Octopus API request: {method} {endpoint}  params: {kwargs.get('params', {})}")
+        logger.debug("Octopus API request: %s %s  params: %s", method, endpoint, kwargs.get("params", {}))
 
         # Build full URL
-        url = urljoin(urljoin(self.BASE_URL, self.API_ENDPOINT), endpoint)
+        url = self._base + endpoint
+
+        return self._send(method, url, **kwargs)
+
+    def _send(self, method, url, **kwargs):
+        """Send a request to a full Octopus API URL, raising on error responses.
+
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            url: Full request URL
+            **kwargs: Keyword arguments for session.request (e.g., params, data)
+
+        Returns:
+            requests.Response object
+
+        Raises:
+            HTTPError: If the response status indicates an error
+        """
+        cache_key = None
+        if self.cache and method == "GET":
+            params = kwargs.get("params")
+            cache_key = self.cache.key(url, params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Octopus API cache hit: %s", url)
+                return self._cached_response(url, cached)
 
         # Make the request using parent class
+        kwargs.setdefault("timeout", self.TIMEOUT)
         req = super().request(method, url, **kwargs)
 
         try:
             req.raise_for_status()
         except HTTPError:
-            logger.error(f"Octopus API error {req.status_code} {responses.get(req.status_code, 'Unknown')}")
+            logger.error("Octopus API error %s %s", req.status_code, responses.get(req.status_code, "Unknown"))
             if req.headers.get("Content-Type") == "application/json":
                 try:
                     error_data = req.json()
-                    logger.error(f"Error response: {error_data}")
+                    logger.error("Error response: %s", error_data)
                 except Exception:
                     pass
             raise
 
+        if cache_key:
+            self.cache.set(cache_key, req.content, self.cache.ttl(url, params))
+
         return req
 
-    def consumption(self, url=None, period_from=None, period_to=None, on_page=None):
+    @staticmethod
+    def _cached_response(url, content):
+        """Build a response object from a cached body.
+
+        Args:
+            url: Request URL the body was cached for
+            content: Raw cached response body
+
+        Returns:
+            requests.Response object
+        """
+        resp = Response()
+        resp.status_code = 200
+        resp.url = url
+        resp._content = content
+        resp.headers["Content-Type"] = "application/json"
+        resp.request_timestamp = datetime.now(UTC)
+        return resp
+
+    def consumption(self, url=None, period_from=None, period_to=None, on_page=None, as_tuples=False):
         """Fetch electricity consumption data.
 
+        Pages are delivered in order. When on_page is provided each page is handed to the
+        callback instead of being accumulated, so only a bounded number of pages is held in memory.
+
         Args:
             url: Full URL for pagination (overrides endpoint/params)
             period_from: Start datetime (ISO 8601, defaults to 1970-01-01)
             period_to: End datetime (ISO 8601)
-            on_page: Optional callback(page_data) called for each page before recursion
+            on_page: Optional callback(page_data) called for each page as it arrives
+            as_tuples: Produce insert-ready row tuples (see ElectricityConsumption.to_insert_values)
+                instead of dataclass instances, e.g. to feed PostgresDB.insert_rows_batch
 
         Returns:
-            List of ElectricityConsumption dataclass instances
+            List of ElectricityConsumption dataclass instances, or row tuples when as_tuples is set
+            (empty when on_page is provided)
+        """
+        consumption = []
+        for page in self.consumption_pages(url, period_from, period_to, as_tuples):
+            # Hand the page to the callback if provided (for per-page processing), otherwise accumulate
+            if on_page:
+                on_page(page)
+            else:
+                consumption.extend(page)
+
+        return consumption
+
+    def consumption_pages(self, url=None, period_from=None, period_to=None, as_tuples=False):
+        """Fetch electricity consumption data one page at a time.
+
+        Generator version of consumption(): nothing is requested until the first page is consumed,
+        and only the pages currently being fetched are held in memory.
+
+        Args:
+            url: Full URL for pagination (overrides endpoint/params)
+            period_from: Start datetime (ISO 8601, defaults to 1970-01-01)
+            period_to: End datetime (ISO 8601)
+            as_tuples: Yield insert-ready row tuples instead of dataclass instances
+
+        Yields:
+            Non-empty lists of ElectricityConsumption dataclass instances (or row tuples), in page order
         """
         if url:
             # URL override, in case it's a paginated request
             # Log pagination request
-            logger.debug(f"Octopus API request: GET {url}")
-            req = self.request("GET", url)
+            logger.debug("Octopus API request: GET %s", url)
+            req = self._send("GET", url)
         else:
             # Default period_from to UNIX epoch if not provided
             if not period_from:
                 period_from = self.DEFAULT_PERIOD_FROM
-                logger.info(f"No period_from provided, defaulting to {period_from}")
+                logger.info("No period_from provided, defaulting to %s", period_from)
 
-            endpoint = f"electricity-meter-points/{self.electricity_mpan}/meters/{self.electricity_sn}/consumption"
             parameters = {
                 "period_from": period_from,
                 "period_to": period_to,
@@ -120,44 +227,152 @@ class Octopus(Session):
                 "group_by": None,
             }
 
-            logger.debug(f"Fetching consumption from {period_from} to {period_to or 'now'}")
+            logger.debug("Fetching consumption from %s to %s", period_from, period_to or "now")
 
-            req = self._request("GET", endpoint, params=parameters)
+            req = self._request("GET", self._consumption_endpoint, params=parameters)
 
-        try:
-            data = req.json()
-
-            # Log debug info only if results are present
-            if data["results"]:
-                logger.debug(
-                    f"Got {data['count']} data points from "
-                    f"{data['results'][0]['interval_start']} to "
-                    f"{data['results'][-1]['interval_end']}"
-                )
-            else:
-                logger.debug(f"API response contains {data['count']} total records but no results in this page")
-
-            consumption = [
-                ElectricityConsumption.from_dict(
-                    {
-                        "mpan": self.electricity_mpan,
-                        "meter_sn": self.electricity_sn,
-                        **cons,
-                    }
-                )
-                for cons in data["results"]
-            ]
-
-            # Call callback if provided (for per-page processing)
-            if on_page and consumption:
-                on_page(consumption)
-
-            # Handle pagination
-            if data.get("next"):
-                logger.debug("Fetching next page of consumption data")
-                consumption += self.consumption(url=data.get("next"), on_page=on_page)
-
-            return consumption
-
-        except requests.exceptions.HTTPError:
-            raise
+        build_page = self._rows if as_tuples else self._records
+
+        for data in self._pages(req):
+            # Per-page summary; checked up front so the page isn't indexed when DEBUG is off
+            if logger.isEnabledFor(logging.DEBUG):
+                if data["results"]:
+                    logger.debug(
+                        "Got %s data points from %s to %s",
+                        data["count"],
+                        data["results"][0]["interval_start"],
+                        data["results"][-1]["interval_end"],
+                    )
+                else:
+                    logger.debug("API response contains %s total records but no results in this page", data["count"])
+
+            page = build_page(data["results"])
+            if page:
+                yield page
+
+    def _records(self, results):
+        """Convert a page of API results to dataclass instances.
+
+        Args:
+            results: 'results' list of an API page
+
+        Returns:
+            List of ElectricityConsumption dataclass instances
+        """
+        # Loop-invariant meter identifiers, hoisted out of the per-record construction
+        mpan, meter_sn = self.electricity_mpan, self.electricity_sn
+        return [
+            ElectricityConsumption(
+                mpan=mpan,
+                meter_sn=meter_sn,
+                consumption=float(cons["consumption"]),
+                interval_start=parse_timestamp(cons["interval_start"]),
+                interval_end=parse_timestamp(cons["interval_end"]),
+                unit=cons.get("unit", "kWh"),
+            )
+            for cons in results
+        ]
+
+    def _rows(self, results):
+        """Convert a page of API results to insert-ready row tuples, skipping dataclass construction.
+
+        Args:
+            results: 'results' list of an API page
+
+        Returns:
+            List of (mpan, meter_sn, consumption, interval_start, interval_end, unit) tuples
+        """
+        mpan, meter_sn = self.electricity_mpan, self.electricity_sn
+        return [
+            (
+                mpan,
+                meter_sn,
+                float(cons["consumption"]),
+                parse_timestamp(cons["interval_start"]),
+                parse_timestamp(cons["interval_end"]),
+                cons.get("unit", "kWh"),
+            )
+            for cons in results
+        ]
+
+    def _pages(self, req):
+        """Yield the JSON payload of every page, starting from an already fetched first page.
+
+        The remaining pages are derived from the first 'next' link and the total count, then
+        fetched concurrently (at most max_workers in flight) and yielded in page order.
+
+        Args:
+            req: requests.Response of the first page
+
+        Yields:
+            Decoded JSON payload of each page
+        """
+        data = self._parse_json(req)
+        yield data
+
+        if not data.get("next"):
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque()
+            for page_url in self._page_urls(data["next"], data["count"]):
+                pending.append(executor.submit(self._get_page, page_url))
+                if len(pending) >= self.max_workers:
+                    data = pending.popleft().result()
+                    yield data
+
+            while pending:
+                data = pending.popleft().result()
+                yield data
+
+        # Follow any pages beyond the initially reported count sequentially
+        while data.get("next"):
+            data = self._get_page(data["next"])
+            yield data
+
+    def _page_urls(self, next_url, count):
+        """Build the URLs of all remaining pages from the first 'next' link.
+
+        Args:
+            next_url: 'next' link returned with the first page
+            count: Total number of records reported by the API
+
+        Returns:
+            List of page URLs, starting with next_url's page
+        """
+        parts = urlsplit(next_url)
+        query = parse_qs(parts.query, keep_blank_values=True)
+        first_page = int(query.get("page", ["2"])[0])
+        page_size = int(query.get("page_size", [self.page_size])[0])
+        last_page = max(first_page, ceil(count / page_size))
+
+        return [
+            urlunsplit(parts._replace(query=urlencode({**query, "page": page}, doseq=True)))
+            for page in range(first_page, last_page + 1)
+        ]
+
+    def _get_page(self, url):
+        """Fetch a single page of consumption data.
+
+        Args:
+            url: Full page URL
+
+        Returns:
+            Decoded JSON payload of the page
+        """
+        logger.debug("Octopus API request: GET %s", url)
+        return self._parse_json(self._send("GET", url))
+
+    def _parse_json(self, resp):
+        """Decode a JSON response body.
+
+        Uses orjson when installed, which decodes the raw bytes directly instead of
+        going through Response.json() and its text decoding step.
+
+        Args:
+            resp: requests.Response (or cached response) to decode
+
+        Returns:
+            Decoded JSON payload
+        """
+        return _loads(resp.content)
@@ -1,9 +1,13 @@
+import math
 import os
+from collections.abc import Iterable, Iterator
 from contextlib import contextmanager
+from datetime import tzinfo
 
 import psycopg
-from psycopg import conninfo
+from psycopg import conninfo, sql
 from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool, PoolTimeout
 
 from .dataclasses import ElectricityConsumption
 from .logging_config import get_logger
@@ -11,17 +15,81 @@ from .logging_config import get_logger
 logger = get_logger(__name__)
 
 
+def _localize_row(row: tuple, tz: tzinfo) -> tuple:
+    """Attach tz to the naive interval datetimes of an insert row tuple.
+
+    Args:
+        row: (mpan, meter_sn, consumption, interval_start, interval_end, unit) tuple
+        tz: Time zone naive datetimes are read in
+
+    Returns:
+        Row tuple with timezone-aware interval datetimes
+    """
+    mpan, meter_sn, consumption, interval_start, interval_end, unit = row
+    if interval_start.tzinfo is None:
+        interval_start = interval_start.replace(tzinfo=tz)
+    if interval_end.tzinfo is None:
+        interval_end = interval_end.replace(tzinfo=tz)
+    return mpan, meter_sn, consumption, interval_start, interval_end, unit
+
+
 class PostgresDB:
     """PostgreSQL database connection handler using raw SQL with dataclasses.
 
     Implements the Raw+DC pattern for type-safe database operations without an ORM.
     """
 
-    def __init__(self):
+    # Batches smaller than this are upserted directly instead of going through COPY + staging table
+    COPY_MIN_ROWS = 50
+
+    # Rows fetched per round-trip by server-side cursors when streaming results
+    SCAN_ITERSIZE = 10_000
+
+    # Seconds to wait for the pool's first connection before giving up
+    CONNECT_TIMEOUT = 5
+
+    # Prepare every statement server-side on its first execution (psycopg default: 5), so each
+    # pooled connection parses and plans a given query only once
+    PREPARE_THRESHOLD = 0
+
+    # Reads the pre-aggregated electricity_daily table (see ElectricityConsumption.CREATE_TABLE_SQL)
+    DAILY_AGGREGATIONS_SQL = """
+        SELECT date, total_consumption, reading_count, first_reading, last_reading, unit
+        FROM electricity_daily
+        WHERE mpan = %s
+        ORDER BY date DESC;
+    """
+
+    # Same query for get_daily_aggregations_arrow: ADBC hands it to libpq as-is, so it needs native $1 placeholders
+    DAILY_AGGREGATIONS_ARROW_SQL = """
+        SELECT date, total_consumption, reading_count, first_reading, last_reading, unit
+        FROM electricity_daily
+        WHERE mpan = $1
+        ORDER BY date DESC;
+    """
+
+    # Latest interval_end per MPAN (NULL if none), formatted server-side as a UTC ISO 8601 string with Z suffix
+    # for the API. A correlated MAX per MPAN lets the planner read it from the end of idx_mpan_interval_end,
+    # which a GROUP BY over all of an MPAN's rows would not.
+    LATEST_TIMESTAMPS_SQL = """
+        SELECT m, (
+            SELECT to_char(MAX(interval_end) AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"Z"')
+            FROM electricity_consumption
+            WHERE mpan = m
+        ) AS latest
+        FROM unnest(%s::text[]) AS m;
+    """
+
+    def __init__(self, schema: str | None = None):
         """Initialize PostgreSQL connection handler.
 
         Attempts to connect using DATABASE_URL if available,
         otherwise builds connection string from individual environment variables.
+        Connections are served from a pool sized by DB_POOL_SIZE (default: 5).
+
+        Args:
+            schema: Optional schema to keep all tables in (created if missing), e.g. to isolate
+                concurrent test runs. Defaults to the server's search_path (normally public).
         """
         # Try to get connection string from DATABASE_URL first
         connection_string = os.getenv("DATABASE_URL")
@@ -48,35 +116,94 @@ class PostgresDB:
         else:
             logger.debug("Using DATABASE_URL connection string")
 
+        if schema:
+            # Set at connection startup, so every connection (pooled or ADBC) resolves tables in the schema only.
+            # The schema is quoted as an identifier, with spaces and backslashes escaped for libpq's options
+            # parsing, and appended to any options already in the connection string.
+            search_path = sql.Identifier(schema).as_string().replace("\\", "\\\\").replace(" ", "\\ ")
+            options = conninfo.conninfo_to_dict(connection_string).get("options")
+            options = " ".join(filter(None, [options, f"-c search_path={search_path}"]))
+            connection_string = conninfo.make_conninfo(connection_string, options=options)
+
         self.connection_string = connection_string
+        self.schema = schema
+
+        # Reuse connections across queries instead of opening a new one per call
+        self.pool = ConnectionPool(
+            self.connection_string,
+            min_size=1,
+            max_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            kwargs={"prepare_threshold": self.PREPARE_THRESHOLD},
+            open=True,
+        )
 
         try:
-            # Test connection
-            with psycopg.connect(self.connection_string):
-                logger.info("Successfully connected to PostgreSQL")
-        except Exception as e:
+            # Block until the pool's first connection is up, which doubles as the connection test
+            self.pool.wait(timeout=self.CONNECT_TIMEOUT)
+        except PoolTimeout as e:
+            self.pool.close()
+            # The pool only logs why its connection attempts failed, so connect once directly to raise
+            # the actual error (refused, bad password, ...) instead of a bare timeout. Bounded by the same
+            # timeout (libpq takes whole seconds), so an unreachable host cannot hang on the OS TCP timeout.
+            try:
+                psycopg.connect(self.connection_string, connect_timeout=math.ceil(self.CONNECT_TIMEOUT)).close()
+            except psycopg.Error as connect_error:
+                logger.error(f"Unable to connect to PostgreSQL: {connect_error}", exc_info=True)
+                raise connect_error from e
             logger.error(f"Unable to connect to PostgreSQL: {e}", exc_info=True)
             raise
+        logger.info("Successfully connected to PostgreSQL")
+
+        if schema:
+            with self.get_connection() as conn:
+                conn.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {};").format(sql.Identifier(schema)))
+                conn.commit()
+            logger.debug(f"Using schema {schema}")
+
+    def close(self):
+        """Close the connection pool and every connection it holds."""
+        self.pool.close()
+        logger.debug("PostgreSQL connection pool closed")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     @contextmanager
     def get_connection(self):
         """Context manager for database connections.
 
+        Borrows a connection from the pool and returns it on exit.
+
         Yields:
             psycopg connection object
         """
-        conn = psycopg.connect(self.connection_string)
-        try:
+        with self.pool.connection() as conn:
             yield conn
-        finally:
-            conn.close()
 
     def create_tables(self):
-        """Create all tables defined in dataclass schema."""
-        logger.debug("Creating database tables")
+        """Create all tables defined in dataclass schema.
+
+        The DDL is skipped when every relation in the schema already exists. On creation, the time zone
+        electricity_daily buckets readings into days is fixed to DAILY_TIMEZONE, or else to the session
+        TimeZone (the server's, unless the connection string overrides it).
+        """
+        relations = list(ElectricityConsumption.SCHEMA_RELATIONS)
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(ElectricityConsumption.CREATE_TABLE_SQL)
+                cur.execute(ElectricityConsumption.SCHEMA_EXISTS_SQL, (relations,))
+                if cur.fetchone()[0] == len(relations):
+                    logger.debug("Database tables already exist")
+                    return
+
+                logger.debug("Creating database tables")
+                # Several statements in one string cannot be a prepared statement
+                cur.execute(ElectricityConsumption.CREATE_TABLE_SQL, prepare=False)
+                cur.execute(ElectricityConsumption.INIT_DAILY_TIMEZONE_SQL, (os.getenv("DAILY_TIMEZONE"),))
+                # Aggregate any readings stored before electricity_daily existed
+                cur.execute(ElectricityConsumption.REBUILD_DAILY_SQL, prepare=False)
                 conn.commit()
         logger.info("Database tables created successfully")
 
@@ -96,7 +223,12 @@ class PostgresDB:
         with self.get_connection() as conn:
             with conn.cursor() as cur:
                 values = consumption.to_insert_values()
-                cur.execute(ElectricityConsumption.UPSERT_SQL, values)
+                # Send the upsert, the daily update and the commit together; the RETURNING row is read once
+                # all are done
+                with conn.pipeline():
+                    cur.execute(ElectricityConsumption.UPSERT_SQL, values)
+                    self._update_daily(conn, [consumption.mpan], [consumption.interval_start])
+                    conn.commit()
                 result = cur.fetchone()
 
                 if result:
@@ -104,31 +236,130 @@ class PostgresDB:
                     consumption.created_at = result[1]
                     logger.debug(f"Record inserted with id={consumption.id}")
 
-                conn.commit()
-
         return consumption
 
     def insert_consumptions_batch(self, consumptions: list[ElectricityConsumption]) -> None:
         """Insert or update multiple consumption records in batch.
 
+        Rows are streamed with binary COPY into a temporary staging table and merged into
+        electricity_consumption with a single INSERT ... ON CONFLICT statement.
+        Batches smaller than COPY_MIN_ROWS skip the staging table and are upserted
+        in pipeline mode instead.
+
         Args:
             consumptions: List of ElectricityConsumption dataclass instances
         """
-        if not consumptions:
+        self.insert_rows_batch(ElectricityConsumption.to_insert_rows(consumptions))
+
+    def insert_consumptions_stream(
+        self, pages: Iterable[list[ElectricityConsumption]], chunk_size: int = 10_000
+    ) -> int:
+        """Insert or update consumption records as they are produced.
+
+        Pages are buffered with BufferedInserter and written every chunk_size records, so an
+        iterable such as Octopus.consumption_pages() is stored without holding all of it in memory.
+
+        Args:
+            pages: Iterable of ElectricityConsumption lists
+            chunk_size: Number of records buffered before each database write
+
+        Returns:
+            Number of records written
+        """
+        with BufferedInserter(self, chunk_size=chunk_size) as inserter:
+            for page in pages:
+                inserter.add_rows(ElectricityConsumption.to_insert_rows(page))
+        return inserter.total
+
+    def insert_rows_batch(self, rows: list[tuple]) -> None:
+        """Insert or update multiple consumption rows in batch.
+
+        Same as insert_consumptions_batch, but takes row tuples directly so callers that
+        never need dataclass instances (e.g. Octopus.consumption(as_tuples=True)) avoid building them.
+
+        Args:
+            rows: List of (mpan, meter_sn, consumption, interval_start, interval_end, unit) tuples,
+                with float consumption. Naive interval datetimes are read in the session time zone.
+        """
+        if not rows:
             logger.warning("No consumptions provided for batch insert")
             return
 
-        logger.debug(f"Starting batch insert of {len(consumptions)} records")
+        logger.debug(f"Starting batch insert of {len(rows)} records")
+
         with self.get_connection() as conn:
+            # Binary COPY sends timestamptz, which needs aware datetimes. Attach the session time zone to
+            # naive ones, which is how the server reads them in a plain INSERT.
+            if any(row[3].tzinfo is None or row[4].tzinfo is None for row in rows):
+                tz = conn.info.timezone
+                rows = [_localize_row(row, tz) for row in rows]
+
+            # ON CONFLICT DO UPDATE cannot affect the same row twice, so keep the last reading per key
+            values = {(row[0], row[1], row[3]): row for row in rows}
+
             with conn.cursor() as cur:
-                # Prepare values for batch insert
-                values = [c.to_insert_values() for c in consumptions]
+                use_copy = len(values) >= self.COPY_MIN_ROWS
+
+                # Pipeline mode sends each group of statements without waiting for every reply.
+                # COPY cannot run inside a pipeline, so the staging path uses one before and one after it.
+                with conn.pipeline():
+                    # Batches are idempotent upserts that can simply be replayed, so don't wait for the WAL
+                    # flush on commit. A crash may lose the last few batches but never leaves the table
+                    # inconsistent.
+                    cur.execute("SET LOCAL synchronous_commit = off")
+
+                    if use_copy:
+                        cur.execute(ElectricityConsumption.CREATE_STAGING_SQL)
+                    else:
+                        cur.executemany(ElectricityConsumption.UPSERT_SQL, list(values.values()))
+
+                if use_copy:
+                    # COPY streams all rows in a single command instead of one round-trip per row
+                    with cur.copy(ElectricityConsumption.COPY_STAGING_SQL) as copy:
+                        copy.set_types(ElectricityConsumption.STAGING_TYPES)
+                        for row in values.values():
+                            copy.write_row(row)
+
+                with conn.pipeline():
+                    if use_copy:
+                        cur.execute(ElectricityConsumption.MERGE_STAGING_SQL)
+                    self._update_daily(conn, [key[0] for key in values], [key[2] for key in values])
+                    conn.commit()
+
+        logger.info(f"Successfully inserted/updated {len(rows)} consumption records")
+
+    def _update_daily(self, conn, mpans: list[str], interval_starts: list) -> None:
+        """Recompute the electricity_daily rows for the days of the given readings.
+
+        Runs in the caller's transaction (and pipeline, if any), so the aggregates commit with the write.
+        Each touched day is locked until that commit, so concurrent writers to the same day recompute it in turn.
+
+        electricity_daily is a plain table maintained here rather than a materialized view, so reads never
+        wait for (or see a stale) full refresh. The cost is three extra statements (lock, delete, upsert)
+        in every write, including single-row insert_consumption and delete_consumption; each only reads the
+        touched days through idx_mpan_interval.
 
-                # Use executemany for efficient batch insert
-                cur.executemany(ElectricityConsumption.UPSERT_SQL, values)
-                conn.commit()
+        Args:
+            conn: Connection the readings were written with
+            mpans: MPAN of each written reading
+            interval_starts: interval_start of each written reading, in the same order as mpans
+        """
+        params = (mpans, interval_starts)
+        conn.execute(ElectricityConsumption.LOCK_DAILY_SQL, params)
+        conn.execute(ElectricityConsumption.DELETE_DAILY_SQL, params)
+        conn.execute(ElectricityConsumption.UPSERT_DAILY_SQL, params)
 
-        logger.info(f"Successfully inserted/updated {len(consumptions)} consumption records")
+    def refresh_daily_aggregations(self) -> None:
+        """Rebuild the electricity_daily table read by get_daily_aggregations from scratch.
+
+        Every write method already updates the days it touches, so this is only needed after
+        writing to electricity_consumption with SQL outside this class.
+        """
+        logger.debug("Rebuilding daily aggregations")
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(ElectricityConsumption.REBUILD_DAILY_SQL, prepare=False)
+                conn.commit()
 
     def get_all_consumptions(self) -> list[ElectricityConsumption]:
         """Fetch all consumption records.
@@ -136,12 +367,15 @@ class PostgresDB:
         Returns:
             List of ElectricityConsumption dataclass instances
         """
-        with self.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(ElectricityConsumption.SELECT_ALL_SQL)
-                rows = cur.fetchall()
+        return list(self.iter_all_consumptions())
 
-        return [ElectricityConsumption.from_row(row) for row in rows]
+    def iter_all_consumptions(self) -> Iterator[ElectricityConsumption]:
+        """Stream all consumption records.
+
+        Yields:
+            ElectricityConsumption dataclass instances
+        """
+        return self._iter_consumptions(ElectricityConsumption.SELECT_ALL_SQL)
 
     def get_consumptions_by_mpan(self, mpan: str) -> list[ElectricityConsumption]:
         """Fetch all consumption records for a specific MPAN.
@@ -152,12 +386,18 @@ class PostgresDB:
         Returns:
             List of ElectricityConsumption dataclass instances
         """
-        with self.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(ElectricityConsumption.SELECT_BY_MPAN_SQL, (mpan,))
-                rows = cur.fetchall()
+        return self._fetch_consumptions(ElectricityConsumption.SELECT_BY_MPAN_SQL, (mpan,))
+
+    def iter_consumptions_by_mpan(self, mpan: str) -> Iterator[ElectricityConsumption]:
+        """Stream all consumption records for a specific MPAN.
+
+        Args:
+            mpan: Meter Point Administration Number (13 characters)
 
-        return [ElectricityConsumption.from_row(row) for row in rows]
+        Yields:
+            ElectricityConsumption dataclass instances
+        """
+        return self._iter_consumptions(ElectricityConsumption.SELECT_BY_MPAN_SQL, (mpan,))
 
     def get_consumptions_by_period(self, mpan: str, period_from: str, period_to: str) -> list[ElectricityConsumption]:
         """Fetch consumption records for a specific MPAN and time period.
@@ -167,15 +407,60 @@ class PostgresDB:
             period_from: ISO 8601 datetime string (inclusive)
             period_to: ISO 8601 datetime string (exclusive)
 
+        Returns:
+            List of ElectricityConsumption dataclass instances
+        """
+        return self._fetch_consumptions(ElectricityConsumption.SELECT_BY_PERIOD_SQL, (mpan, period_from, period_to))
+
+    def iter_consumptions_by_period(
+        self, mpan: str, period_from: str, period_to: str
+    ) -> Iterator[ElectricityConsumption]:
+        """Stream consumption records for a specific MPAN and time period.
+
+        Args:
+            mpan: Meter Point Administration Number
+            period_from: ISO 8601 datetime string (inclusive)
+            period_to: ISO 8601 datetime string (exclusive)
+
+        Yields:
+            ElectricityConsumption dataclass instances
+        """
+        return self._iter_consumptions(ElectricityConsumption.SELECT_BY_PERIOD_SQL, (mpan, period_from, period_to))
+
+    def _fetch_consumptions(self, query: str, params: tuple) -> list[ElectricityConsumption]:
+        """Run a consumption query and convert its rows as they are read from the result.
+
+        Args:
+            query: SELECT statement returning full electricity_consumption rows
+            params: Query parameters
+
         Returns:
             List of ElectricityConsumption dataclass instances
         """
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(ElectricityConsumption.SELECT_BY_PERIOD_SQL, (mpan, period_from, period_to))
-                rows = cur.fetchall()
+                cur.execute(query, params)
+                # Iterating the cursor avoids building the intermediate fetchall() list of tuples
+                return list(map(ElectricityConsumption.from_row, cur))
+
+    def _iter_consumptions(self, query: str, params: tuple | None = None) -> Iterator[ElectricityConsumption]:
+        """Stream a consumption query through a server-side cursor.
+
+        Rows are fetched SCAN_ITERSIZE at a time, so memory stays constant regardless of result size.
+        A pooled connection is held until the iterator is exhausted or closed.
 
-        return [ElectricityConsumption.from_row(row) for row in rows]
+        Args:
+            query: SELECT statement returning full electricity_consumption rows
+            params: Query parameters
+
+        Yields:
+            ElectricityConsumption dataclass instances
+        """
+        with self.get_connection() as conn:
+            with conn.cursor(name="ec_scan") as cur:
+                cur.itersize = self.SCAN_ITERSIZE
+                cur.execute(query, params)
+                yield from map(ElectricityConsumption.from_row, cur)
 
     def delete_consumption(self, consumption_id: int) -> bool:
         """Delete a consumption record by ID.
@@ -189,9 +474,15 @@ class PostgresDB:
         logger.debug(f"Deleting consumption record with id={consumption_id}")
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("DELETE FROM electricity_consumption WHERE id = %s;", (consumption_id,))
+                cur.execute(
+                    "DELETE FROM electricity_consumption WHERE id = %s RETURNING mpan, interval_start;",
+                    (consumption_id,),
+                )
+                row = cur.fetchone()
+                deleted = row is not None
+                if deleted:
+                    self._update_daily(conn, [row[0]], [row[1]])
                 conn.commit()
-                deleted = cur.rowcount > 0
                 if deleted:
                     logger.debug(f"Record id={consumption_id} deleted successfully")
                 else:
@@ -209,48 +500,125 @@ class PostgresDB:
         Returns:
             ISO 8601 formatted timestamp string of the latest interval_end, or None if no data exists
         """
-        query = "SELECT MAX(interval_end) as latest FROM electricity_consumption WHERE mpan = %s;"
+        return self.get_latest_consumption_timestamps([mpan])[mpan]
 
-        with self.get_connection() as conn:
-            with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute(query, (mpan,))
-                result = cur.fetchone()
+    def get_latest_consumption_timestamps(self, mpans: list[str]) -> dict[str, str | None]:
+        """Get the latest consumption timestamp for several MPANs in a single query.
 
-        if result and result["latest"]:
-            latest_timestamp = result["latest"]
-            # Convert to ISO 8601 format with Z suffix for API compatibility
-            # The timestamp from DB is already timezone-aware, so just use isoformat()
-            iso_timestamp = latest_timestamp.isoformat().replace("+00:00", "Z")
-            logger.debug(f"Latest consumption timestamp for MPAN {mpan}: {iso_timestamp}")
-            return iso_timestamp
+        Args:
+            mpans: Meter Point Administration Numbers
+
+        Returns:
+            Dictionary mapping each MPAN to the ISO 8601 timestamp string of its latest interval_end,
+            or None if no data exists for it
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(self.LATEST_TIMESTAMPS_SQL, (list(mpans),))
+                latest = dict(cur.fetchall())
 
-        logger.debug(f"No consumption data found for MPAN {mpan}")
-        return None
+        logger.debug(f"Latest consumption timestamps (None if no data): {latest}")
+        return latest
 
     def get_daily_aggregations(self, mpan: str) -> list[dict]:
         """Get daily aggregated consumption data.
 
+        Served from the electricity_daily table, which every write method keeps up to date.
+        Days are calendar days of interval_start in the zone fixed by create_tables (see DAILY_TIMEZONE).
+
         Args:
             mpan: Meter Point Administration Number
 
         Returns:
             List of dictionaries with daily aggregation data
         """
-        query = """
-            SELECT
-                DATE(interval_start) as date,
-                SUM(consumption) as total_consumption,
-                COUNT(*) as reading_count,
-                MIN(interval_start) as first_reading,
-                MAX(interval_end) as last_reading,
-                unit
-            FROM electricity_consumption
-            WHERE mpan = %s
-            GROUP BY DATE(interval_start), unit
-            ORDER BY DATE(interval_start) DESC;
-        """
-
         with self.get_connection() as conn:
             with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute(query, (mpan,))
+                cur.execute(self.DAILY_AGGREGATIONS_SQL, (mpan,))
                 return cur.fetchall()
+
+    def get_daily_aggregations_arrow(self, mpan: str):
+        """Get daily aggregated consumption data as a columnar Arrow table.
+
+        Fetched through the ADBC PostgreSQL driver, which decodes results straight into Arrow
+        buffers instead of building a Python object per value. Requires the arrow extra:
+        pip install "octo-usage[arrow]".
+
+        Args:
+            mpan: Meter Point Administration Number
+
+        Returns:
+            pyarrow.Table with the same columns as get_daily_aggregations
+
+        Raises:
+            ImportError: If the ADBC PostgreSQL driver is not installed
+        """
+        try:
+            from adbc_driver_postgresql import dbapi as adbc
+        except ImportError as e:
+            raise ImportError('get_daily_aggregations_arrow requires "octo-usage[arrow]"') from e
+
+        with adbc.connect(self.connection_string) as conn:
+            with conn.cursor() as cur:
+                cur.execute(self.DAILY_AGGREGATIONS_ARROW_SQL, (mpan,))
+                return cur.fetch_arrow_table()
+
+
+class BufferedInserter:
+    """Buffer consumption rows and write them to PostgresDB in batches.
+
+    Rows are flushed with insert_rows_batch every chunk_size rows and when the context exits,
+    so each write goes through COPY rather than one upsert and commit per row.
+
+    Usage:
+        with BufferedInserter(db, chunk_size=1000) as inserter:
+            inserter.add_rows(page)
+    """
+
+    def __init__(self, db: PostgresDB, chunk_size: int = 10_000):
+        """Initialize the inserter.
+
+        Args:
+            db: PostgresDB instance to write to
+            chunk_size: Number of rows buffered before each database write
+        """
+        self.db = db
+        self.chunk_size = chunk_size
+        self.total = 0
+        self._buffer = []
+
+    def add_rows(self, rows: list[tuple]) -> None:
+        """Buffer row tuples, flushing once chunk_size rows are pending.
+
+        Args:
+            rows: (mpan, meter_sn, consumption, interval_start, interval_end, unit) tuples
+        """
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def add(self, consumption: ElectricityConsumption) -> None:
+        """Buffer a single consumption record.
+
+        Args:
+            consumption: ElectricityConsumption dataclass instance
+        """
+        self.add_rows([consumption.to_insert_values()])
+
+    def flush(self) -> None:
+        """Write all pending rows in a single batch."""
+        if not self._buffer:
+            return
+        self.db.insert_rows_batch(self._buffer)
+        # Only count rows once they are stored, so a failed write leaves total unchanged
+        self.total += len(self._buffer)
+        logger.info(f"Inserted {len(self._buffer)} consumption records (total so far: {self.total})")
+        self._buffer.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Pending rows are only written if the block completed; a failed write is not retried
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,53 @@
+"""Fixtures shared by the CLI test modules."""
+
+import os
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+
+@pytest.fixture(scope="session")
+def runner():
+    """Create one Click CLI test runner for the whole session (CliRunner keeps no state between invokes)."""
+    return CliRunner()
+
+
+@pytest.fixture
+def mock_env():
+    """Mock environment variables."""
+    return {
+        "OCTOPUS_API_KEY": "sk_test_123",
+        "OCTOPUS_ELECTRICITY_MPAN": "1234567890123",
+        "OCTOPUS_ELECTRICITY_SN": "METER001",
+        "POSTGRES_HOST": "localhost",
+        "POSTGRES_PORT": "5432",
+        "POSTGRES_USER": "test",
+        "POSTGRES_PASSWORD": "test",
+        "POSTGRES_DB": "test_db",
+        "LOG_LEVEL": "INFO",
+        "LOG_FORMAT": "text",
+    }
+
+
+@pytest.fixture
+def patched_env(mock_env):
+    """Apply the mocked environment variables for the duration of a test."""
+    with mock.patch.dict(os.environ, mock_env):
+        yield
+
+
+@pytest.fixture
+def patched_db():
+    """Patch PostgresDB and return the mock database instance."""
+    with mock.patch("octo_usage.__main__.PostgresDB") as mock_db_class:
+        yield mock_db_class.return_value
+
+
+@pytest.fixture
+def patched_octopus():
+    """Patch Octopus and return the mock API instance (returning no data by default)."""
+    with mock.patch("octo_usage.__main__.Octopus") as mock_octopus_class:
+        mock_octopus_instance = mock_octopus_class.return_value
+        mock_octopus_instance.consumption.return_value = []
+        yield mock_octopus_instance
@@ -0,0 +1,24 @@
+"""Test data factory for ElectricityConsumption records."""
+
+from datetime import UTC, datetime, timedelta
+
+from octo_usage.dataclasses import ElectricityConsumption
+
+
+def make_records(count, tz=UTC, consumption=0.5, start=0):
+    """Build count consecutive half-hourly records in tz (naive if None).
+
+    The first record is the start-th half hour after 2023-01-15 00:00, so consecutive calls can continue a series.
+    """
+    base = datetime(2023, 1, 15, 0, 0, tzinfo=tz)
+    return [
+        ElectricityConsumption(
+            mpan="1234567890123",
+            meter_sn="METER001",
+            consumption=consumption,
+            interval_start=base + timedelta(minutes=30 * i),
+            interval_end=base + timedelta(minutes=30 * (i + 1)),
+            unit="kWh",
+        )
+        for i in range(start, start + count)
+    ]
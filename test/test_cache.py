@@ -0,0 +1,95 @@
+"""Unit tests for the Octopus API response cache."""
+
+import os
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+import pytest
+import requests_mock
+
+from octo_usage.cache import ResponseCache
+from octo_usage.octopus import Octopus
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for a Redis client."""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+
+class TestResponseCache:
+    @pytest.fixture
+    def cache(self):
+        return ResponseCache(FakeRedis())
+
+    def test_from_env_disabled(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            assert ResponseCache.from_env() is None
+
+    def test_key_ignores_param_order(self, cache):
+        url = "https://api.octopus.energy/v1/consumption"
+        key = cache.key(url, {"period_from": "a", "page_size": 10})
+
+        assert key.startswith(ResponseCache.KEY_PREFIX)
+        assert key == cache.key(url, {"page_size": 10, "period_from": "a"})
+        assert key != cache.key(url, {"page_size": 20, "period_from": "a"})
+
+    def test_ttl(self, cache):
+        url = "https://api.octopus.energy/v1/consumption"
+        old = (datetime.now(UTC) - timedelta(days=7)).isoformat()
+        recent = datetime.now(UTC).isoformat()
+
+        assert cache.ttl(url, {"period_to": None}) == ResponseCache.RECENT_TTL
+        assert cache.ttl(url, {"period_to": recent}) == ResponseCache.RECENT_TTL
+        assert cache.ttl(url, {"period_to": old}) == ResponseCache.HISTORICAL_TTL
+        assert cache.ttl(f"{url}?page=2&period_to=2020-01-01T00:00:00Z") == ResponseCache.HISTORICAL_TTL
+
+    def test_client_errors_ignored(self):
+        client = mock.Mock()
+        client.get.side_effect = ConnectionError("redis down")
+        client.setex.side_effect = ConnectionError("redis down")
+        cache = ResponseCache(client)
+
+        assert cache.get("key") is None
+        cache.set("key", b"{}", 60)
+
+    def test_octopus_serves_cached_pages(self):
+        mock_env_vars = {
+            "OCTOPUS_API_KEY": "mock_api_key",
+            "OCTOPUS_ELECTRICITY_MPAN": "mock_e_mpan",
+            "OCTOPUS_ELECTRICITY_SN": "mock_e_sn",
+        }
+        resp = {
+            "count": 1,
+            "next": None,
+            "results": [
+                {
+                    "consumption": 0.074,
+                    "interval_start": "2023-01-15T23:30:00Z",
+                    "interval_end": "2023-01-16T00:00:00Z",
+                },
+            ],
+        }
+        adapter = requests_mock.Adapter()
+        adapter.register_uri("GET", requests_mock.ANY, json=resp)
+
+        with mock.patch.dict(os.environ, mock_env_vars):
+            instance = Octopus()
+        instance.cache = ResponseCache(FakeRedis())
+        instance.mount("https://", adapter)
+
+        first = instance.consumption(period_to="2023-01-16T00:00:00Z")
+        second = instance.consumption(period_to="2023-01-16T00:00:00Z")
+
+        assert adapter.call_count == 1
+        assert first == second
+        assert list(instance.cache.client.ttls.values()) == [ResponseCache.HISTORICAL_TTL]
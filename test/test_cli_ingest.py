@@ -0,0 +1,106 @@
+"""Unit tests for the CLI database ingest path."""
+
+import threading
+
+import pytest
+
+from octo_usage.__main__ import main
+from octo_usage.dataclasses import ElectricityConsumption
+from test.data.electricity_consumption import make_records
+
+
+def make_page(start, size):
+    """Build a page of consecutive half-hourly consumption rows, as fetched with as_tuples=True."""
+    return ElectricityConsumption.to_insert_rows(make_records(size, start=start))
+
+
+@pytest.mark.usefixtures("patched_env")
+class TestCliIngest:
+    """Test storing fetched consumption in the database."""
+
+    @pytest.fixture
+    def run_ingest(self, runner, patched_db, patched_octopus):
+        """Return a function that runs the CLI against mocked pages and returns the size of each database write."""
+
+        def run(pages, args=(), fetch_error=None):
+            writes = []
+
+            def fake_consumption(period_from=None, period_to=None, on_page=None, as_tuples=False):
+                assert as_tuples
+                for page in pages:
+                    on_page(page)
+                if fetch_error:
+                    raise fetch_error
+                return []
+
+            patched_db.insert_rows_batch.side_effect = lambda batch: writes.append(len(batch))
+            patched_octopus.consumption.side_effect = fake_consumption
+
+            result = runner.invoke(main, list(args))
+
+            patched_db.close.assert_called_once()
+            if fetch_error:
+                assert result.exception is fetch_error
+            else:
+                assert result.exit_code == 0, result.output
+
+            return writes
+
+        return run
+
+    def test_pages_buffered_until_batch_size(self, run_ingest):
+        """Test that pages are buffered and written once the batch size is reached."""
+        pages = [make_page(0, 4), make_page(4, 4), make_page(8, 4)]
+
+        batch_sizes = run_ingest(pages, ["--db-batch-size", "5"])
+
+        assert batch_sizes == [8, 4]
+
+    def test_default_batch_size_single_write(self, run_ingest):
+        """Test that small fetches are written to the database in a single batch."""
+        pages = [make_page(0, 3), make_page(3, 3)]
+
+        batch_sizes = run_ingest(pages)
+
+        assert batch_sizes == [6]
+
+    def test_fetch_error_flushes_received_pages(self, run_ingest):
+        """Test that pages received before a fetch error are stored and the error is raised."""
+        pages = [make_page(0, 4), make_page(4, 4)]
+
+        batch_sizes = run_ingest(pages, fetch_error=RuntimeError("API unavailable"))
+
+        assert batch_sizes == [8]
+
+    def test_no_data_no_write(self, run_ingest):
+        """Test that nothing is written when the API returns no data."""
+        batch_sizes = run_ingest([])
+
+        assert batch_sizes == []
+
+    def test_invalid_batch_size(self, runner):
+        """Test that a non-positive batch size is rejected."""
+        result = runner.invoke(main, ["--db-batch-size", "0"])
+
+        assert result.exit_code != 0
+
+    def test_db_error_stops_fetcher(self, runner, patched_db, patched_octopus):
+        """Test that a failed database write stops the fetcher blocked on the full page queue."""
+        handed_over = []
+        db_error = RuntimeError("database unavailable")
+
+        def fake_consumption(period_from=None, period_to=None, on_page=None, as_tuples=False):
+            for i in range(20):
+                on_page(make_page(i, 1))
+                handed_over.append(i)
+            return []
+
+        patched_db.insert_rows_batch.side_effect = db_error
+        patched_octopus.consumption.side_effect = fake_consumption
+
+        result = runner.invoke(main, ["--db-batch-size", "1"])
+
+        assert result.exception is db_error
+        # The fetcher gave up on the remaining pages and was joined before the error was raised
+        assert len(handed_over) < 20
+        assert not any(thread.name == "octopus-fetch" for thread in threading.enumerate())
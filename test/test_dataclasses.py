@@ -1,8 +1,12 @@
-from datetime import datetime
+from dataclasses import fields
+from datetime import UTC, datetime
 
 import pytest
+from psycopg import postgres
+from psycopg.adapt import Transformer
+from psycopg.pq import Format
 
-from octo_usage.dataclasses import ElectricityConsumption
+from octo_usage.dataclasses import ElectricityConsumption, parse_timestamp
 
 
 class TestElectricityConsumption:
@@ -52,6 +56,24 @@ class TestElectricityConsumption:
         instance = ElectricityConsumption.from_dict(data)
         assert instance.meter_sn == "METER123456"
 
+    def test_from_dict_parses_iso_timestamps(self):
+        """Test from_dict parses ISO 8601 strings from the API into datetimes."""
+        data = {
+            "mpan": "1234567890123",
+            "meter_sn": "METER123456",
+            "consumption": 0.5,
+            "interval_start": "2023-01-15T23:30:00Z",
+            "interval_end": "2023-01-16T00:00:00Z",
+        }
+        instance = ElectricityConsumption.from_dict(data)
+        assert instance.interval_start == datetime(2023, 1, 15, 23, 30, tzinfo=UTC)
+        assert instance.interval_end == datetime(2023, 1, 16, 0, 0, tzinfo=UTC)
+
+    def test_parse_timestamp_passthrough(self):
+        """Test parse_timestamp returns datetime instances unchanged."""
+        value = datetime(2023, 1, 15, 23, 30)
+        assert parse_timestamp(value) is value
+
     def test_to_dict(self, sample_instance):
         """Test converting instance to dictionary."""
         result = sample_instance.to_dict()
@@ -60,6 +82,10 @@ class TestElectricityConsumption:
         assert result["consumption"] == 0.5
         assert result["unit"] == "kWh"
 
+    def test_to_dict_covers_all_fields(self, sample_instance):
+        """Test that to_dict returns every dataclass field."""
+        assert set(sample_instance.to_dict()) == {f.name for f in fields(ElectricityConsumption)}
+
     def test_to_insert_values(self, sample_instance):
         """Test converting instance to tuple for INSERT statement."""
         result = sample_instance.to_insert_values()
@@ -68,6 +94,13 @@ class TestElectricityConsumption:
         assert result[1] == "METER123456"  # meter_sn
         assert result[2] == 0.5  # consumption
 
+    def test_to_insert_rows(self, sample_instance):
+        """Test converting several instances at once matches to_insert_values."""
+        rows = ElectricityConsumption.to_insert_rows([sample_instance, sample_instance])
+
+        assert rows == [sample_instance.to_insert_values()] * 2
+        assert len(rows[0]) == len(ElectricityConsumption.INSERT_COLUMNS)
+
     def test_from_row(self):
         """Test creating instance from database row tuple."""
         # Simulating a tuple from database cursor:
@@ -109,3 +142,25 @@ class TestElectricityConsumption:
         assert ElectricityConsumption.SELECT_ALL_SQL is not None
         assert ElectricityConsumption.SELECT_BY_MPAN_SQL is not None
         assert ElectricityConsumption.SELECT_BY_PERIOD_SQL is not None
+        assert ElectricityConsumption.CREATE_STAGING_SQL is not None
+        assert ElectricityConsumption.COPY_STAGING_SQL is not None
+        assert ElectricityConsumption.MERGE_STAGING_SQL is not None
+        assert ElectricityConsumption.SCHEMA_EXISTS_SQL is not None
+
+    def test_staging_types_dump_insert_values(self, sample_data):
+        """Test that insert values of API records can be dumped with the binary COPY staging types."""
+        record = ElectricityConsumption.from_dict(
+            {**sample_data, "interval_start": "2023-01-15T23:30:00Z", "interval_end": "2023-01-16T00:00:00Z"}
+        )
+        transformer = Transformer()
+        oids = [postgres.types.get(name).oid for name in ElectricityConsumption.STAGING_TYPES]
+        transformer.set_dumper_types(oids, Format.BINARY)
+
+        dumped = transformer.dump_sequence(record.to_insert_values(), [Format.BINARY] * len(oids))
+
+        assert len(dumped) == len(ElectricityConsumption.STAGING_TYPES)
+
+    def test_schema_relations_match_ddl(self):
+        """Test that every relation checked by create_tables is created by the schema DDL."""
+        for relation in ElectricityConsumption.SCHEMA_RELATIONS:
+            assert f"EXISTS {relation}" in ElectricityConsumption.CREATE_TABLE_SQL
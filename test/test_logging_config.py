@@ -0,0 +1,30 @@
+"""Unit tests for logging configuration."""
+
+import logging
+import sys
+
+from octo_usage.logging_config import LogfmtFormatter
+
+
+class TestLogfmtFormatter:
+    def make_record(self, msg, exc_info=None):
+        return logging.LogRecord("octo_usage.octopus", logging.INFO, __file__, 1, msg, None, exc_info)
+
+    def test_format(self):
+        line = LogfmtFormatter().format(self.make_record('Fetched "page"\nnext'))
+
+        assert line.startswith("time=")
+        assert ' level=info logger=octopus msg="Fetched \\"page\\"\\nnext"' in line
+        assert "\n" not in line
+
+    def test_format_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = self.make_record("failed", exc_info=sys.exc_info())
+
+        line = LogfmtFormatter().format(record)
+
+        assert line.endswith('"')
+        assert ' exc="Traceback' in line
+        assert "\n" not in line
@@ -8,29 +8,38 @@ import requests
 import requests_mock
 from requests import Session
 
+import octo_usage.octopus
 from octo_usage.dataclasses import ElectricityConsumption
 from octo_usage.octopus import Octopus
 from test.data import octopus_consumption as data
 
+CONSUMPTION_URL_RE = re.compile(r"/.*\/consumption/?(\?.*)?$")
+
+# Fixed HTTP Date header and the timestamp the session hook should parse from it
+RESPONSE_DATE = datetime(2024, 1, 1, tzinfo=UTC)
+RESPONSE_DATE_HEADER = "Mon, 01 Jan 2024 00:00:00 GMT"
 
-class TestOctopus:
-    @pytest.fixture
-    def mock_adapter(self):
-        return requests_mock.Adapter()
 
-    @pytest.fixture
-    def instance(self, mock_adapter):
+class TestOctopus:
+    @pytest.fixture(scope="module")
+    def instance(self):
+        # One session for the module; tests change its state via mock.patch.object/monkeypatch only
         mock_env_vars = {
             "OCTOPUS_API_KEY": "mock_api_key",
             "OCTOPUS_ELECTRICITY_MPAN": "mock_e_mpan",
             "OCTOPUS_ELECTRICITY_SN": "mock_e_sn",
         }
         with mock.patch.dict(os.environ, mock_env_vars):
-            o = Octopus()
-            o.mount("https://", mock_adapter)
-            return o
+            return Octopus()
+
+    @pytest.fixture(autouse=True)
+    def mock_adapter(self, instance):
+        # A fresh adapter per test, so registered responses and request history never leak between tests
+        adapter = requests_mock.Adapter(case_sensitive=True)
+        instance.mount("https://", adapter)
+        return adapter
 
-    def test_consumption_no_args(self, instance):
+    def test_consumption_no_args(self, instance, mock_adapter):
         expected_kwargs = {
             "period_from": "1970-01-01T00:00:00Z",
             "period_to": None,
@@ -49,20 +58,19 @@ class TestOctopus:
                 },
             ],
         }
-        with mock.patch.object(Session, "request") as mock_request:
-            mock_response = mock.Mock()
-            mock_response.json.return_value = resp
-            mock_request.return_value = mock_response
+        mock_adapter.register_uri("GET", CONSUMPTION_URL_RE, json=resp)
+
+        with mock.patch.object(instance, "hooks", {}):
             _ = instance.consumption()
-            assert mock_request.call_count == 1
-            call_kwargs = mock_request.call_args[1]
-            assert call_kwargs.get("params", {}).get("period_from") == expected_kwargs["period_from"]
+
+        assert mock_adapter.call_count == 1
+        assert mock_adapter.last_request.qs["period_from"] == [expected_kwargs["period_from"]]
 
     def test_consumption_recursive(self, instance, mock_adapter):
         with mock.patch.object(instance, "hooks", {}):
             mock_adapter.register_uri(
                 "GET",
-                re.compile(r"/.*\/consumption/?(\?.*)?$"),
+                CONSUMPTION_URL_RE,
                 [{"json": data.response_one}, {"json": data.response_two}],
             )
 
@@ -82,8 +90,107 @@ class TestOctopus:
                 for cons_data in data.response_one["results"] + data.response_two["results"]
             ]
 
+    def test_consumption_decodes_with_orjson(self, instance, mock_adapter):
+        orjson = pytest.importorskip("orjson")
+        assert octo_usage.octopus._loads is orjson.loads
+
+        mock_adapter.register_uri(
+            "GET",
+            CONSUMPTION_URL_RE,
+            [{"json": data.response_one}, {"json": data.response_two}],
+        )
+
+        with (
+            mock.patch.object(instance, "hooks", {}),
+            mock.patch("octo_usage.octopus._loads", wraps=orjson.loads) as mock_loads,
+        ):
+            instance.consumption()
+
+        assert mock_loads.call_count == 2
+
+    def test_consumption_on_page(self, instance, mock_adapter):
+        with mock.patch.object(instance, "hooks", {}):
+            mock_adapter.register_uri(
+                "GET",
+                CONSUMPTION_URL_RE,
+                [{"json": data.response_one}, {"json": data.response_two}],
+            )
+
+            pages = []
+            cons = instance.consumption(on_page=pages.append)
+
+            assert mock_adapter.call_count == 2
+            assert cons == []
+            assert [len(page) for page in pages] == [
+                len(data.response_one["results"]),
+                len(data.response_two["results"]),
+            ]
+
+    def test_consumption_pages(self, instance, mock_adapter):
+        with mock.patch.object(instance, "hooks", {}):
+            mock_adapter.register_uri(
+                "GET",
+                CONSUMPTION_URL_RE,
+                [{"json": data.response_one}, {"json": data.response_two}],
+            )
+
+            pages = instance.consumption_pages()
+
+            # Nothing is fetched until the generator is consumed
+            assert mock_adapter.call_count == 0
+            assert next(pages) == instance._records(data.response_one["results"])
+            assert list(pages) == [instance._records(data.response_two["results"])]
+            assert mock_adapter.call_count == 2
+
+    def test_consumption_as_tuples(self, instance, mock_adapter):
+        with mock.patch.object(instance, "hooks", {}):
+            mock_adapter.register_uri(
+                "GET",
+                CONSUMPTION_URL_RE,
+                [{"json": data.response_one}, {"json": data.response_two}],
+            )
+
+            rows = instance.consumption(as_tuples=True)
+            records = [
+                ElectricityConsumption.from_dict({"mpan": "mock_e_mpan", "meter_sn": "mock_e_sn", **cons_data})
+                for cons_data in data.response_one["results"] + data.response_two["results"]
+            ]
+
+            assert rows == [record.to_insert_values() for record in records]
+
+    def test_consumption_concurrent_pages(self, instance, mock_adapter, monkeypatch):
+        monkeypatch.setattr(instance, "page_size", 2)
+        base_url = "https://api.octopus.energy/v1/electricity-meter-points/mock_e_mpan/meters/mock_e_sn/consumption/"
+        pages = [
+            {
+                "count": 8,
+                "next": f"{base_url}?order_by=period&page={page + 1}&page_size=2" if page < 4 else None,
+                "results": [
+                    {
+                        "consumption": page + i / 10,
+                        "interval_start": f"2023-01-16T0{page}:{i * 30:02d}:00Z",
+                        "interval_end": f"2023-01-16T0{page}:{i * 30 + 29:02d}:59Z",
+                    }
+                    for i in range(2)
+                ],
+            }
+            for page in range(1, 5)
+        ]
+        mock_adapter.register_uri("GET", CONSUMPTION_URL_RE, json=pages[0])
+        for page in range(2, 5):
+            mock_adapter.register_uri("GET", f"{base_url}?page={page}", json=pages[page - 1])
+
+        with mock.patch.object(instance, "hooks", {}):
+            received = []
+            instance.consumption(on_page=received.append)
+
+        assert mock_adapter.call_count == 4
+        assert [[c.consumption for c in page] for page in received] == [
+            [r["consumption"] for r in page["results"]] for page in pages
+        ]
+
     def test_consumption_with_url(self, instance, mock_adapter):
-        mock_adapter.register_uri("GET", url=re.compile(r"/.*\/consumption/?(\?.*)?$"), json=data.response_two)
+        mock_adapter.register_uri("GET", url=CONSUMPTION_URL_RE, json=data.response_two)
 
         path = "https://test.com/api/path/consumption"
         with (
@@ -109,36 +216,39 @@ class TestOctopus:
         assert instance.auth.username == instance.api_key
         assert instance.auth.password == ""
 
+    def test_connection_pool_sized_to_workers(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            o = Octopus(max_workers=4)
+
+        adapter = o.get_adapter(o.BASE_URL)
+        assert adapter._pool_maxsize == 4
+
+    def test_invalid_max_workers(self):
+        with pytest.raises(ValueError, match="max_workers"):
+            Octopus(max_workers=0)
+
     def test_session_hooks(self, instance):
         headers = requests.structures.CaseInsensitiveDict()
-        now = datetime.now(UTC)
-        headers["date"] = now.strftime("%a, %d %b %Y %H:%M:%S %Z")
+        headers["date"] = RESPONSE_DATE_HEADER
 
         mock_adapter = requests_mock.Adapter()
         mock_adapter.register_uri("GET", "mock://test.com", headers=headers)
         instance.mount("mock://", mock_adapter)
 
         resp = instance.get("mock://test.com")
-        assert resp.request_timestamp == now.replace(microsecond=0)
+        assert resp.request_timestamp == RESPONSE_DATE
 
-    def test_get_endpoint_slash(self, instance):
-        with mock.patch("requests.Session.request") as mock_request:
-            mock_response = mock.Mock()
-            mock_response.raise_for_status.return_value = None
-            mock_request.return_value = mock_response
+    def test_get_endpoint_slash(self, instance, mock_adapter):
+        mock_adapter.register_uri("GET", requests_mock.ANY)
 
+        with mock.patch.object(instance, "hooks", {}):
             instance._request("GET", "endpoint-a")
             instance._request("GET", "endpoint-a")
-            assert mock_request.call_count == 2
-            # Both calls should have the same URL
-            call1_url = mock_request.call_args_list[0][0][1]
-            call2_url = mock_request.call_args_list[1][0][1]
-            assert call1_url == call2_url == "https://api.octopus.energy/v1/endpoint-a"
-            assert mock_request.call_count == 2
-            # Both calls should have the same URL
-            call1_url = mock_request.call_args_list[0][0][1]
-            call2_url = mock_request.call_args_list[1][0][1]
-            assert call1_url == call2_url == "https://api.octopus.energy/v1/endpoint-a"
+
+        assert mock_adapter.call_count == 2
+        # Both calls should have the same URL
+        call1_url, call2_url = (request.url for request in mock_adapter.request_history)
+        assert call1_url == call2_url == "https://api.octopus.energy/v1/endpoint-a"
 
     def test_get_exc_no_url_and_endpoint(self, instance):
         # _request now requires an endpoint parameter
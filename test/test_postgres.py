@@ -1,19 +1,67 @@
 """Integration tests for PostgreSQL database layer."""
 
-from datetime import UTC, datetime, timedelta
+import os
+import threading
+from dataclasses import replace
+from datetime import UTC, date, datetime, timedelta
+from unittest import mock
 
+import psycopg
 import pytest
+from psycopg import conninfo, sql
+from psycopg_pool import PoolTimeout
 
 from octo_usage.dataclasses import ElectricityConsumption
-from octo_usage.postgres import PostgresDB
+from octo_usage.postgres import BufferedInserter, PostgresDB
+from test.data.electricity_consumption import make_records
 
 pytestmark = pytest.mark.integration
 
 
-@pytest.fixture
+# One schema per pytest-xdist worker, so `pytest -n auto` runs never share tables
+TEST_SCHEMA = f"test_{os.getenv('PYTEST_XDIST_WORKER', 'gw0')}"
+
+# COPY batches are tested with both aware and naive datetimes, which the binary COPY handles differently
+copy_timezones = pytest.mark.parametrize("tz", [UTC, None], ids=["aware", "naive"])
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    """Create the schema once for the whole test session and drop it afterwards."""
+    with PostgresDB(schema=TEST_SCHEMA) as db:
+        db.create_tables()
+        yield
+        with db.get_connection() as conn:
+            conn.execute(sql.SQL("DROP SCHEMA {} CASCADE;").format(sql.Identifier(TEST_SCHEMA)))
+            conn.commit()
+
+
+@pytest.fixture(scope="class")
 def db():
-    """Create a PostgresDB instance for testing."""
-    return PostgresDB()
+    """Create a PostgresDB instance shared by the test class, so its pool is opened once."""
+    with PostgresDB(schema=TEST_SCHEMA) as db:
+        yield db
+
+
+@pytest.fixture
+def single_connection_db(monkeypatch):
+    """Create a PostgresDB whose pool holds one connection, for tests of per-session state.
+
+    The shared db pool grows once a test borrows two connections at a time, after which
+    consecutive calls may each get a different connection.
+    """
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    with PostgresDB(schema=TEST_SCHEMA) as db:
+        yield db
+
+
+@pytest.fixture(autouse=True)
+def clean_tables(db):
+    """Start every test from an empty table, keeping the schema in place."""
+    with db.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE electricity_consumption, electricity_daily RESTART IDENTITY;")
+            conn.commit()
 
 
 @pytest.fixture
@@ -50,9 +98,59 @@ def sample_consumptions():
     return records
 
 
+@pytest.fixture
+def daily_dataset(db):
+    """Return a loader that stores days x 48 half-hourly readings of 0.25 kWh through insert_rows_batch."""
+
+    def load(days=2):
+        # Naive datetimes are read in the session time zone, which the schema fixture fixed as the daily zone
+        rows = ElectricityConsumption.to_insert_rows(make_records(days * 48, tz=None, consumption=0.25))
+        # Same path as production writes: binary COPY into staging, merge, then the incremental daily update
+        assert len(rows) >= PostgresDB.COPY_MIN_ROWS
+        db.insert_rows_batch(rows)
+
+    return load
+
+
 class TestPostgresDB:
     """Test PostgreSQL database operations."""
 
+    def test_context_manager_closes_pool(self):
+        """Test that leaving the context manager closes the connection pool."""
+        with PostgresDB() as db:
+            assert not db.pool.closed
+
+        assert db.pool.closed
+
+    def test_schema_keeps_connection_options(self, monkeypatch):
+        """Test that the schema search_path is added to existing connection options and quoted."""
+        with PostgresDB() as base:
+            base_conninfo = base.connection_string
+        monkeypatch.setenv("DATABASE_URL", conninfo.make_conninfo(base_conninfo, options="-c statement_timeout=5s"))
+        schema = f"{TEST_SCHEMA} Quoted"
+
+        with PostgresDB(schema=schema) as db:
+            with db.get_connection() as conn:
+                assert conn.execute("SHOW statement_timeout;").fetchone()[0] == "5s"
+                assert conn.execute("SELECT current_schema();").fetchone()[0] == schema
+                conn.execute(sql.SQL("DROP SCHEMA {};").format(sql.Identifier(schema)))
+                conn.commit()
+
+    def test_connection_error_raised(self, monkeypatch):
+        """Test that a failed connection raises the libpq error rather than the pool timeout."""
+        monkeypatch.setenv("DATABASE_URL", "postgresql://octopus@127.0.0.1:1/octopus_energy")
+        monkeypatch.setattr(PostgresDB, "CONNECT_TIMEOUT", 0.5)
+
+        with pytest.raises(psycopg.OperationalError, match="refused") as exc_info:
+            PostgresDB()
+
+        assert not isinstance(exc_info.value, PoolTimeout)
+
+    def test_pool_connections_prepare_early(self, db):
+        """Test that pooled connections prepare statements on their first execution."""
+        with db.get_connection() as conn:
+            assert conn.prepare_threshold == PostgresDB.PREPARE_THRESHOLD
+
     def test_create_tables(self, db):
         """Test that tables are created successfully."""
         db.create_tables()
@@ -65,6 +163,22 @@ class TestPostgresDB:
                 )
                 assert cur.fetchone()[0] is True
 
+    def test_create_tables_restores_missing_index(self, db):
+        """Test that the schema DDL runs again when one of its relations is missing."""
+        db.create_tables()
+
+        with db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DROP INDEX idx_interval_start;")
+                conn.commit()
+
+        db.create_tables()
+
+        with db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT to_regclass('idx_interval_start') IS NOT NULL;")
+                assert cur.fetchone()[0] is True
+
     def test_insert_consumption(self, db, sample_consumption):
         """Test inserting a single consumption record."""
         result = db.insert_consumption(sample_consumption)
@@ -92,6 +206,23 @@ class TestPostgresDB:
         assert len(records) == 1
         assert records[0].consumption == 0.75
 
+    def test_insert_consumption_prepared(self, single_connection_db, sample_consumption):
+        """Test that repeated single upserts share one server-side prepared statement."""
+        db = single_connection_db
+        db.insert_consumption(sample_consumption)
+        db.insert_consumption(sample_consumption)
+
+        # Both upserts and this check ran on the pool's only connection
+        with db.get_connection() as conn:
+            with conn.cursor() as cur:
+                # Not prepared itself, or its own text would match the LIKE pattern
+                cur.execute(
+                    "SELECT count(*) FROM pg_prepared_statements "
+                    "WHERE statement LIKE '%INSERT INTO electricity_consumption%RETURNING%';",
+                    prepare=False,
+                )
+                assert cur.fetchone()[0] == 1
+
     def test_insert_consumptions_batch(self, db, sample_consumptions):
         """Test batch inserting multiple records."""
         db.insert_consumptions_batch(sample_consumptions)
@@ -99,6 +230,97 @@ class TestPostgresDB:
         all_records = db.get_all_consumptions()
         assert len(all_records) == len(sample_consumptions)
 
+    def test_insert_consumptions_batch_upsert(self, db, sample_consumptions):
+        """Test that batch inserting existing records updates them."""
+        db.insert_consumptions_batch(sample_consumptions)
+
+        for record in sample_consumptions:
+            record.consumption = 1.25
+        db.insert_consumptions_batch(sample_consumptions)
+
+        records = db.get_all_consumptions()
+        assert len(records) == len(sample_consumptions)
+        assert all(r.consumption == 1.25 for r in records)
+
+    @copy_timezones
+    def test_insert_consumptions_batch_copy(self, db, tz):
+        """Test batch inserting enough records to go through the COPY staging path."""
+        records = make_records(PostgresDB.COPY_MIN_ROWS * 2, tz)
+
+        db.insert_consumptions_batch(records)
+
+        stored = db.get_all_consumptions()
+        assert len(stored) == len(records)
+
+        # Naive datetimes are stored in the session time zone, as the small-batch upsert does
+        with db.get_connection() as conn:
+            session_tz = conn.info.timezone
+        assert stored[-1].interval_start == records[0].interval_start.replace(tzinfo=tz or session_tz)
+
+    def test_buffered_inserter(self, db, sample_consumptions, monkeypatch):
+        """Test that the buffered inserter writes in chunks and flushes the remainder on exit."""
+        writes = []
+        insert_rows_batch = db.insert_rows_batch
+        monkeypatch.setattr(
+            db,
+            "insert_rows_batch",
+            lambda rows: writes.append(len(rows)) or insert_rows_batch(rows),
+        )
+
+        with BufferedInserter(db, chunk_size=2) as inserter:
+            for consumption in sample_consumptions:
+                inserter.add(consumption)
+
+        assert writes == [2, 2, 1]
+        assert inserter.total == len(sample_consumptions)
+        assert len(db.get_all_consumptions()) == len(sample_consumptions)
+
+    def test_buffered_inserter_failed_write_not_counted(self, db, sample_consumption, monkeypatch):
+        """Test that rows of a failed write are not added to the inserter total."""
+        monkeypatch.setattr(db, "insert_rows_batch", mock.Mock(side_effect=psycopg.OperationalError("gone")))
+        inserter = BufferedInserter(db, chunk_size=1)
+
+        with pytest.raises(psycopg.OperationalError):
+            inserter.add(sample_consumption)
+
+        assert inserter.total == 0
+
+    def test_insert_consumptions_stream(self, db, sample_consumptions):
+        """Test storing records page by page from a generator."""
+        pages = (sample_consumptions[i : i + 2] for i in range(0, len(sample_consumptions), 2))
+
+        total = db.insert_consumptions_stream(pages, chunk_size=3)
+
+        assert total == len(sample_consumptions)
+        assert len(db.get_all_consumptions()) == len(sample_consumptions)
+
+    @copy_timezones
+    def test_insert_consumptions_batch_copy_repeated(self, single_connection_db, tz):
+        """Test that consecutive COPY batches reuse the staging table without leaking rows."""
+        db = single_connection_db
+        size = PostgresDB.COPY_MIN_ROWS * 2
+        records = make_records(size * 2, tz)
+
+        db.insert_consumptions_batch(records[:size])
+        db.insert_consumptions_batch(records[size:])
+
+        with db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT count(*) FROM electricity_consumption_staging;")
+                assert cur.fetchone()[0] == 0
+
+        assert len(db.get_all_consumptions()) == len(records)
+
+    def test_insert_consumptions_batch_duplicate_keys(self, db, sample_consumption):
+        """Test that duplicate readings within one batch keep the last value."""
+        duplicate = ElectricityConsumption.from_dict({**sample_consumption.to_dict(), "consumption": 0.9})
+
+        db.insert_consumptions_batch([sample_consumption, duplicate])
+
+        records = db.get_all_consumptions()
+        assert len(records) == 1
+        assert records[0].consumption == 0.9
+
     def test_get_all_consumptions(self, db, sample_consumptions):
         """Test fetching all consumption records."""
         db.insert_consumptions_batch(sample_consumptions)
@@ -110,6 +332,18 @@ class TestPostgresDB:
         # Records should be in DESC order by interval_start
         assert records[0].interval_start > records[-1].interval_start
 
+    def test_iter_all_consumptions(self, db, sample_consumptions, monkeypatch):
+        """Test streaming all records through the server-side cursor in several fetches."""
+        db.insert_consumptions_batch(sample_consumptions)
+        monkeypatch.setattr(db, "SCAN_ITERSIZE", 2)
+
+        records = db.iter_all_consumptions()
+
+        assert not isinstance(records, list)
+        assert [r.interval_start for r in records] == sorted(
+            (c.interval_start for c in sample_consumptions), reverse=True
+        )
+
     def test_get_consumptions_by_mpan(self, db, sample_consumptions):
         """Test querying records by MPAN."""
         db.insert_consumptions_batch(sample_consumptions)
@@ -139,6 +373,19 @@ class TestPostgresDB:
         assert len(records) > 0
         assert all(period_from <= r.interval_start < period_to for r in records)
 
+    def test_iter_consumptions_by_period(self, db, sample_consumptions, monkeypatch):
+        """Test streaming a period query matches the list variant."""
+        db.insert_consumptions_batch(sample_consumptions)
+        monkeypatch.setattr(db, "SCAN_ITERSIZE", 1)
+        args = (
+            "1234567890123",
+            sample_consumptions[0].interval_start.isoformat(),
+            sample_consumptions[2].interval_start.isoformat(),
+        )
+
+        assert list(db.iter_consumptions_by_period(*args)) == db.get_consumptions_by_period(*args)
+        assert list(db.iter_consumptions_by_mpan("1234567890123")) == db.get_consumptions_by_mpan("1234567890123")
+
     def test_delete_consumption(self, db, sample_consumption):
         """Test deleting a consumption record."""
         # Insert a record
@@ -162,28 +409,10 @@ class TestPostgresDB:
         deleted = db.delete_consumption(999999)
         assert deleted is False
 
-    def test_get_daily_aggregations(self, db):
+    def test_get_daily_aggregations(self, db, daily_dataset):
         """Test getting daily aggregated consumption data."""
-        # Insert records for 2 days
-        base_date = datetime(2023, 1, 15, 0, 0)
-        records = []
-
-        for day in range(2):
-            for hour in range(0, 24, 1):
-                interval_start = base_date + timedelta(days=day, hours=hour)
-                interval_end = interval_start + timedelta(hours=1)
-                records.append(
-                    ElectricityConsumption(
-                        mpan="1234567890123",
-                        meter_sn="METER001",
-                        consumption=0.5,
-                        interval_start=interval_start,
-                        interval_end=interval_end,
-                        unit="kWh",
-                    )
-                )
-
-        db.insert_consumptions_batch(records)
+        # Insert half-hourly records for 2 days
+        daily_dataset(days=2)
 
         # Get daily aggregations
         aggregations = db.get_daily_aggregations("1234567890123")
@@ -191,10 +420,146 @@ class TestPostgresDB:
         # Should have 2 days
         assert len(aggregations) == 2
 
-        # Each day should have 24 readings
+        # Each day should have 48 readings
         for agg in aggregations:
-            assert agg["reading_count"] == 24
-            assert agg["total_consumption"] == pytest.approx(12.0)  # 24 * 0.5
+            assert agg["reading_count"] == 48
+            assert agg["total_consumption"] == pytest.approx(12.0)  # 48 * 0.25
+
+    def test_daily_aggregations_follow_single_writes(self, db, sample_consumption):
+        """Test that single inserts, updates and deletes keep the daily aggregates current."""
+        result = db.insert_consumption(sample_consumption)
+
+        [day] = db.get_daily_aggregations("1234567890123")
+        assert day["reading_count"] == 1
+        assert day["total_consumption"] == pytest.approx(0.5)
+
+        sample_consumption.consumption = 0.75
+        db.insert_consumption(sample_consumption)
+
+        [day] = db.get_daily_aggregations("1234567890123")
+        assert day["reading_count"] == 1
+        assert day["total_consumption"] == pytest.approx(0.75)
+
+        db.delete_consumption(result.id)
+
+        assert db.get_daily_aggregations("1234567890123") == []
+
+    def test_daily_aggregations_concurrent_writers(self, db, sample_consumption):
+        """Test that a writer to a day waits for another open write to it, so neither total is partial."""
+        noon = datetime(2023, 1, 15, 12, 0, tzinfo=UTC)
+        first = replace(sample_consumption, interval_start=noon, interval_end=noon + timedelta(minutes=30))
+        second = replace(
+            first, interval_start=first.interval_end, interval_end=first.interval_end + timedelta(minutes=30)
+        )
+
+        with db.get_connection() as conn:
+            conn.execute(ElectricityConsumption.UPSERT_SQL, first.to_insert_values())
+            db._update_daily(conn, [first.mpan], [first.interval_start])
+
+            writer = threading.Thread(target=db.insert_consumption, args=(second,))
+            writer.start()
+            writer.join(timeout=0.5)
+            # Blocked on the day lock held by the open transaction above
+            assert writer.is_alive()
+            conn.commit()
+
+        writer.join()
+        [day] = db.get_daily_aggregations("1234567890123")
+        assert day["reading_count"] == 2
+        assert day["total_consumption"] == pytest.approx(1.0)
+
+    def test_refresh_daily_aggregations_waits_for_writer(self, db, sample_consumption):
+        """Test that a rebuild waits for an open write to electricity_daily instead of conflicting with it."""
+        errors = []
+
+        def refresh():
+            try:
+                db.refresh_daily_aggregations()
+            except psycopg.Error as e:
+                errors.append(e)
+
+        with db.get_connection() as conn:
+            conn.execute(ElectricityConsumption.UPSERT_SQL, sample_consumption.to_insert_values())
+            db._update_daily(conn, [sample_consumption.mpan], [sample_consumption.interval_start])
+
+            rebuild = threading.Thread(target=refresh)
+            rebuild.start()
+            rebuild.join(timeout=0.5)
+            # Blocked on the table lock until the open transaction above commits
+            assert rebuild.is_alive()
+            conn.commit()
+
+        rebuild.join()
+        assert errors == []
+        [day] = db.get_daily_aggregations("1234567890123")
+        assert day["reading_count"] == 1
+
+    def test_daily_aggregations_session_time_zone(self, db, sample_consumption, monkeypatch):
+        """Test that writers in different session time zones bucket a reading into the same day."""
+        # 02:00 UTC on 2023-01-16 is still 2023-01-15 in New York
+        early = datetime(2023, 1, 16, 2, 0, tzinfo=UTC)
+        reading = replace(sample_consumption, interval_start=early, interval_end=early + timedelta(minutes=30))
+        db.insert_consumption(reading)
+
+        new_york = conninfo.make_conninfo(db.connection_string, options="-c TimeZone=America/New_York")
+        monkeypatch.setenv("DATABASE_URL", new_york)
+        with PostgresDB(schema=TEST_SCHEMA) as new_york_db:
+            reading.consumption = 0.75
+            new_york_db.insert_consumption(reading)
+
+        with db.get_connection() as conn:
+            expected = conn.execute(
+                "SELECT DATE(%s AT TIME ZONE timezone) FROM electricity_daily_timezone;", (early,)
+            ).fetchone()[0]
+
+        [day] = db.get_daily_aggregations("1234567890123")
+        assert day["date"] == expected
+        assert day["reading_count"] == 1
+        assert day["total_consumption"] == pytest.approx(0.75)
+
+    def test_daily_timezone_setting(self, sample_consumption, monkeypatch):
+        """Test that DAILY_TIMEZONE fixes the zone daily rows are bucketed in when the tables are created."""
+        monkeypatch.setenv("DAILY_TIMEZONE", "Australia/Sydney")
+        schema = f"{TEST_SCHEMA}_sydney"
+        # 14:00 UTC on 2023-01-15 is already 2023-01-16 in Sydney
+        afternoon = datetime(2023, 1, 15, 14, 0, tzinfo=UTC)
+        reading = replace(sample_consumption, interval_start=afternoon, interval_end=afternoon + timedelta(minutes=30))
+
+        with PostgresDB(schema=schema) as db:
+            try:
+                db.create_tables()
+                db.insert_consumption(reading)
+                [day] = db.get_daily_aggregations("1234567890123")
+            finally:
+                with db.get_connection() as conn:
+                    conn.execute(sql.SQL("DROP SCHEMA {} CASCADE;").format(sql.Identifier(schema)))
+                    conn.commit()
+
+        assert day["date"] == date(2023, 1, 16)
+
+    def test_daily_aggregations_follow_batch_writes(self, db, sample_consumptions):
+        """Test that batch upserts only need to update their own days to match a full rebuild."""
+        db.insert_consumptions_batch(sample_consumptions)
+        sample_consumptions[0].consumption = 2.0
+        db.insert_consumptions_batch(sample_consumptions[:1])
+
+        incremental = db.get_daily_aggregations("1234567890123")
+        db.refresh_daily_aggregations()
+
+        # Sample readings are 30 hours apart, so each falls on its own day
+        assert len(incremental) == len(sample_consumptions)
+        assert incremental == db.get_daily_aggregations("1234567890123")
+
+    def test_get_daily_aggregations_arrow(self, db, sample_consumptions):
+        """Test that the Arrow aggregation matches the dict-based one."""
+        pytest.importorskip("adbc_driver_postgresql")
+        db.insert_consumptions_batch(sample_consumptions)
+
+        table = db.get_daily_aggregations_arrow("1234567890123")
+        aggregations = db.get_daily_aggregations("1234567890123")
+
+        assert table.num_rows == len(aggregations)
+        assert table.column("reading_count").to_pylist() == [agg["reading_count"] for agg in aggregations]
 
     def test_conversion_to_from_row(self, db, sample_consumption):
         """Test dataclass conversion methods work with database rows."""
@@ -253,6 +618,7 @@ class TestPostgresDB:
         """Test that indexes are created for query performance."""
         indexes = [
             "idx_mpan_interval",
+            "idx_mpan_interval_end",
             "idx_meter_interval",
             "idx_interval_start",
         ]
@@ -320,3 +686,10 @@ class TestPostgresDB:
         assert latest_mpan1 is not None
         assert latest_mpan2 is not None
         assert latest_mpan2 > latest_mpan1
+
+        # A single query returns the same values, with None for MPANs without data
+        assert db.get_latest_consumption_timestamps(["1234567890123", "9876543210123", "0000000000000"]) == {
+            "1234567890123": latest_mpan1,
+            "9876543210123": latest_mpan2,
+            "0000000000000": None,
+        }